@@ -0,0 +1,124 @@
+# arranque.py
+"""Perfil de arranque del worker e importación diferida de las librerías pesadas.
+
+Se importa primero en app.py: los tiempos se cuentan desde ese momento.
+
+* Fases (duración de la primera vez): carga (primera instantánea de datos),
+  callbacks (registro de los componentes) y layout (primer layout serializado).
+* Hitos (segundos desde el inicio): imports (terminan los imports de app.py),
+  listo (app.py importada: el worker ya atiende) y datos (primera instantánea).
+* Con TABLERO_PERFIL_ARRANQUE=1 se mide además el tiempo propio de import de
+  cada paquete hasta que el worker queda listo, y se imprime un resumen al
+  quedar listo y al publicarse los datos.
+
+Fases e hitos se exponen en /metrics (tablero_arranque_segundos).
+
+perezoso("pandas") devuelve un sustituto del módulo que lo importa recién
+al usar uno de sus atributos: numpy, pandas y plotly.express no se cargan
+al arrancar sino con la primera carga de datos o la primera figura.
+"""
+import builtins
+import importlib
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import config
+
+INICIO = time.perf_counter()
+
+fases = {}
+hitos = {}
+imports = Counter()  # paquete -> segundos propios de import
+
+
+class ModuloPerezoso:
+    """Sustituto de un módulo que se importa con el primer atributo pedido."""
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+
+    def __getattr__(self, atributo):
+        # import_module es seguro entre hilos: si otro hilo lo está
+        # importando, espera a que termine
+        valor = getattr(importlib.import_module(self._nombre), atributo)
+        # Las siguientes consultas no pasan por __getattr__
+        self.__dict__[atributo] = valor
+        return valor
+
+    def __repr__(self):
+        return f"<módulo perezoso {self._nombre!r}>"
+
+
+def perezoso(nombre):
+    return ModuloPerezoso(nombre)
+
+
+@contextmanager
+def fase(nombre):
+    """Mide el bloque como fase `nombre` (solo cuenta la primera vez)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        fases.setdefault(nombre, time.perf_counter() - inicio)
+
+
+def hito(nombre):
+    """Registra que se alcanzó `nombre` (segundos desde INICIO, la primera vez)."""
+    if nombre in hitos:
+        return
+    hitos[nombre] = time.perf_counter() - INICIO
+    if nombre == "listo":
+        _dejar_de_perfilar()
+    if config.PERFIL_ARRANQUE and nombre in ("listo", "datos"):
+        print(resumen(nombre))
+
+
+def resumen(titulo="arranque", paquetes=12):
+    lineas = [f"Arranque ({titulo}):"]
+    lineas += [f"  hito {nombre:10} {segundos:7.3f}s" for nombre, segundos in hitos.items()]
+    lineas += [f"  fase {nombre:10} {segundos:7.3f}s" for nombre, segundos in fases.items()]
+    lineas += [f"  import {nombre:24} {segundos:7.3f}s" for nombre, segundos in imports.most_common(paquetes)]
+    return "\n".join(lineas)
+
+
+def metricas():
+    """Filas para metricas.agregar_externa: ((etiquetas), segundos)."""
+    return [((("tipo", "hito"), ("nombre", n)), s) for n, s in hitos.items()] \
+        + [((("tipo", "fase"), ("nombre", n)), s) for n, s in fases.items()] \
+        + [((("tipo", "import"), ("nombre", n)), s) for n, s in imports.items()]
+
+
+# --- tiempo de import por paquete (TABLERO_PERFIL_ARRANQUE=1) --------------
+
+_import_original = builtins.__import__
+_local = threading.local()
+
+
+def _importar(nombre, globales=None, locales=None, desde=(), nivel=0):
+    # Import relativo: se atribuye al paquete que lo hace
+    paquete = ((globales or {}).get("__package__") or "") if nivel else nombre
+    pila = getattr(_local, "pila", None)
+    if pila is None:
+        pila = _local.pila = []
+    pila.append(0.0)
+    inicio = time.perf_counter()
+    try:
+        return _import_original(nombre, globales, locales, desde, nivel)
+    finally:
+        total = time.perf_counter() - inicio
+        # Tiempo propio: sin los imports anidados, que cuentan para su paquete
+        imports[paquete.partition(".")[0] or "?"] += total - pila.pop()
+        if pila:
+            pila[-1] += total
+
+
+def _dejar_de_perfilar():
+    if builtins.__import__ is _importar:
+        builtins.__import__ = _import_original
+
+
+if config.PERFIL_ARRANQUE:
+    builtins.__import__ = _importar
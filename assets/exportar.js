@@ -0,0 +1,36 @@
+/* Enlaces de descarga (/exportar/...) que siguen el filtro vigente de cada vista.
+ *
+ * El servidor arma el href inicial (ruta y municipio); aquí solo se
+ * actualizan los parámetros que cambian en el navegador.
+ */
+(function () {
+    function conParametros(href, parametros) {
+        if (!href) {
+            return window.dash_clientside.no_update;
+        }
+        var url = new URL(href, window.location.href);
+        Object.keys(parametros).forEach(function (clave) {
+            var valor = parametros[clave];
+            if (valor === null || valor === undefined || valor === "") {
+                url.searchParams.delete(clave);
+            } else {
+                url.searchParams.set(clave, valor);
+            }
+        });
+        return url.pathname + url.search;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        exportar: {
+            tabla: function (filter_query, sort_by, href_csv, href_xlsx) {
+                var orden = (sort_by && sort_by.length) ? sort_by[0] : {};
+                var parametros = {filtro: filter_query, orden: orden.column_id, dir: orden.direction};
+                return [conParametros(href_csv, parametros), conParametros(href_xlsx, parametros)];
+            },
+            sifilis: function (tab, municipio, eps, href_csv, href_xlsx) {
+                var parametros = {tab: tab, municipio: municipio, eps: eps};
+                return [conParametros(href_csv, parametros), conParametros(href_xlsx, parametros)];
+            }
+        }
+    });
+})();
@@ -0,0 +1,76 @@
+/* Filtro de la serie semanal de sífilis en el navegador (TABLERO_SIFILIS_CLIENTE=1).
+ *
+ * El store "sifilis-cubo" trae el cubo completo una sola vez: claves (uint32)
+ * y casos (float32) en base64, más el layout base de la figura. Cambiar de
+ * pestaña, municipio o EPS solo recorre esos arreglos; no va al servidor.
+ */
+(function () {
+    var decodificados = new WeakMap();
+
+    function arreglo(texto, Tipo) {
+        var binario = atob(texto);
+        var bytes = new Uint8Array(binario.length);
+        for (var i = 0; i < binario.length; i++) {
+            bytes[i] = binario.charCodeAt(i);
+        }
+        return new Tipo(bytes.buffer);
+    }
+
+    function decodificar(cubo) {
+        var listo = decodificados.get(cubo);
+        if (!listo) {
+            listo = {
+                claves: arreglo(cubo.claves, Uint32Array),
+                casos: arreglo(cubo.casos, Float32Array)
+            };
+            decodificados.set(cubo, listo);
+        }
+        return listo;
+    }
+
+    function serie(cubo, evento, municipio, eps) {
+        var e = cubo.eventos.indexOf(evento);
+        // Sin filtro (o valor desconocido para el cubo) -> marginal "todos"
+        var m = municipio ? cubo.municipios.indexOf(municipio) : cubo.municipios.length;
+        var p = eps ? cubo.eps.indexOf(eps) : cubo.eps.length;
+        var x = [], y = [];
+        if (e < 0 || m < 0 || p < 0) {
+            return {x: x, y: y};
+        }
+
+        // Las claves de una celda son contiguas en el espacio lineal
+        var nSemanas = cubo.semanas.length;
+        var inicio = ((e * (cubo.municipios.length + 1) + m) * (cubo.eps.length + 1) + p) * nSemanas;
+        var fin = inicio + nSemanas;
+        var datos = decodificar(cubo);
+        for (var i = 0; i < datos.claves.length; i++) {
+            var clave = datos.claves[i];
+            if (clave >= inicio && clave < fin) {
+                x.push(cubo.semanas[clave - inicio]);
+                y.push(datos.casos[i]);
+            }
+        }
+        return {x: x, y: y};
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        sifilis: {
+            grafico: function (tab, municipio, eps, cubo) {
+                if (!cubo) {
+                    return window.dash_clientside.no_update;
+                }
+                var evento = tab === "gestacional" ? "Sífilis Gestacional" : "Sífilis Congénita";
+                var s = serie(cubo, evento, municipio, eps);
+                var layout = Object.assign({}, cubo.layout, {
+                    title: Object.assign({}, cubo.layout.title, {
+                        text: "Casos de " + evento + " por semana epidemiológica"
+                    })
+                });
+                return {
+                    data: [Object.assign({}, cubo.traza, {x: s.x, y: s.y})],
+                    layout: layout
+                };
+            }
+        }
+    });
+})();
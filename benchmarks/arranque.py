@@ -0,0 +1,187 @@
+# benchmarks/arranque.py
+"""Tiempo de arranque de un worker de gunicorn hasta atender y hasta tener datos.
+
+Uso (desde la raíz del repositorio):
+
+    python benchmarks/arranque.py                      # data/ del repositorio
+    python benchmarks/arranque.py --anios 10           # Excel sintéticos de 10 años
+    python benchmarks/arranque.py --arbol /tmp/otro    # otro checkout (p. ej. un commit anterior)
+
+Cada corrida levanta gunicorn con un worker y sin preload (el worker importa
+la app por su cuenta, como al reiniciarse) y mide desde el lanzamiento:
+
+* listo: primera respuesta 200 de "/" (el worker ya atiende);
+* datos: primera respuesta 200 de /_dash-layout (la primera carga terminó).
+
+Se mide con la caché columnar fría (directorio vacío: se leen los Excel) y
+tibia (la de la corrida anterior). Si el árbol expone los tiempos internos de
+arranque (arranque.py), se agregan desde /metrics.
+
+Los resultados se guardan en benchmarks/resultados/arranque/<commit>.json y
+se comparan con la corrida anterior.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIR_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados", "arranque")
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar(url, proceso, limite):
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError("gunicorn terminó durante el arranque")
+        try:
+            with urllib.request.urlopen(url, timeout=limite - time.monotonic()) as r:
+                r.read()
+                return time.monotonic()
+        except (OSError, ValueError):
+            time.sleep(0.005)
+    raise RuntimeError(f"{url} no respondió a tiempo")
+
+
+def _tiempos_internos(url):
+    """tablero_arranque_segundos de /metrics: {"hito listo": s, "fase carga": s, ...}."""
+    try:
+        with urllib.request.urlopen(f"{url}/metrics", timeout=5) as r:
+            texto = r.read().decode("utf-8")
+    except (OSError, urllib.error.HTTPError):
+        return {}
+    patron = r'^tablero_arranque_segundos\{tipo="(hito|fase)",nombre="([^"]+)"\} (\S+)$'
+    return {f"{tipo} {nombre}": float(valor) for tipo, nombre, valor in re.findall(patron, texto, re.M)}
+
+
+def arrancar(arbol, data_dir, cache_dir, timeout):
+    puerto = _puerto_libre()
+    entorno = dict(os.environ, PORT=str(puerto), WEB_CONCURRENCY="1", TABLERO_PRELOAD="0",
+                   TABLERO_DATA_DIR=data_dir, TABLERO_CACHE_DIR=cache_dir,
+                   TABLERO_VIGILANCIA_SEG="0", TABLERO_PRECALENTAR="0")
+    url = f"http://127.0.0.1:{puerto}"
+    comando = [sys.executable, "-m", "gunicorn", "app:server", "--bind", f"127.0.0.1:{puerto}", "--workers", "1"]
+    if os.path.exists(os.path.join(arbol, "gunicorn.conf.py")):
+        # Árboles anteriores no tienen gunicorn.conf.py; bind y workers van explícitos igual
+        comando += ["--config", "gunicorn.conf.py"]
+    inicio = time.monotonic()
+    proceso = subprocess.Popen(comando, cwd=arbol, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        limite = inicio + timeout
+        listo = _esperar(f"{url}/", proceso, limite)
+        datos = _esperar(f"{url}/_dash-layout", proceso, limite)
+        internos = _tiempos_internos(url)
+    finally:
+        proceso.terminate()
+        proceso.wait()
+    return {"listo_s": listo - inicio, "datos_s": datos - inicio, **internos}
+
+
+def escribir_sinteticos(anios, destino):
+    """Excel de las cuatro fuentes con datos sintéticos (se reutilizan entre corridas)."""
+    sys.path.insert(0, RAIZ)
+    from benchmarks import sinteticos
+    from datos.carga import FUENTES
+
+    for nombre, df in sinteticos.generar(anios=anios).items():
+        df.to_excel(os.path.join(destino, FUENTES[nombre]), index=False)
+    for extra in glob.glob(os.path.join(RAIZ, "data", "*.json")):
+        # Geometría municipal para los mapas
+        with open(extra, "rb") as origen, open(os.path.join(destino, os.path.basename(extra)), "wb") as f:
+            f.write(origen.read())
+
+
+def commit(arbol):
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=arbol, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def resultado_anterior(excluir):
+    archivos = sorted(glob.glob(os.path.join(DIR_RESULTADOS, "*.json")), key=os.path.getmtime)
+    archivos = [a for a in archivos if os.path.abspath(a) != os.path.abspath(excluir)]
+    return archivos[-1] if archivos else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arbol", default=RAIZ, help="checkout del tablero a medir")
+    parser.add_argument("--anios", type=int, help="usar Excel sintéticos de estos años en vez de data/")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--salida", help="dónde guardar el JSON (por defecto resultados/arranque/<commit>.json)")
+    args = parser.parse_args()
+    arbol = os.path.abspath(args.arbol)
+
+    with tempfile.TemporaryDirectory(prefix="tablero-arranque-") as tmp:
+        data_dir = os.path.join(arbol, "data")
+        if args.anios:
+            data_dir = os.path.join(tmp, "data")
+            os.makedirs(data_dir)
+            escribir_sinteticos(args.anios, data_dir)
+
+        resultados = {}
+        for escenario in ("fria", "tibia"):
+            cache_tibia = os.path.join(tmp, "cache-tibia")
+            corridas = []
+            for i in range(args.repeticiones):
+                # Fría: caché vacía en cada corrida; tibia: la misma caché, ya armada
+                cache_dir = os.path.join(tmp, f"cache-{i}") if escenario == "fria" else cache_tibia
+                corridas.append(arrancar(arbol, data_dir, cache_dir, args.timeout))
+            resultados[escenario] = {
+                clave: round(statistics.median(c[clave] for c in corridas), 3)
+                for clave in corridas[0] if all(clave in c for c in corridas)
+            }
+            if escenario == "fria":
+                # Deja armada la caché de la corrida tibia
+                arrancar(arbol, data_dir, cache_tibia, args.timeout)
+
+    salida = args.salida or os.path.join(DIR_RESULTADOS, f"{commit(arbol)}.json")
+    anterior = args.comparar or resultado_anterior(salida)
+    previos = {}
+    if anterior and os.path.exists(anterior):
+        with open(anterior, encoding="utf-8") as f:
+            previos = json.load(f)["escenarios"]
+
+    print(f"{'escenario':10} {'listo s':>9} {'datos s':>9}  vs. anterior (listo / datos)")
+    for escenario, r in resultados.items():
+        cambio = ""
+        if escenario in previos:
+            cambio = " / ".join(f"{r[k] / previos[escenario][k]:.2f}x" for k in ("listo_s", "datos_s"))
+        print(f"{escenario:10} {r['listo_s']:9.3f} {r['datos_s']:9.3f}  {cambio}")
+        internos = {k: v for k, v in r.items() if k not in ("listo_s", "datos_s")}
+        if internos:
+            print("           dentro del worker: " + ", ".join(f"{k} {v:.3f}s" for k, v in internos.items()))
+
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit(arbol),
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "anios": args.anios,
+            "repeticiones": args.repeticiones,
+            "escenarios": resultados,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {os.path.relpath(salida, RAIZ)}")
+    if anterior:
+        print(f"Comparado con {os.path.relpath(anterior, RAIZ)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# benchmarks/bench_callbacks.py
+"""Latencia, asignaciones y tamaño de respuesta de cada callback del tablero.
+
+Uso (desde la raíz del repositorio):
+
+    python benchmarks/bench_callbacks.py               # 10 años sintéticos
+    python benchmarks/bench_callbacks.py --anios 3 --repeticiones 20
+    python benchmarks/bench_callbacks.py --comparar benchmarks/resultados/abc1234.json
+
+Los resultados se guardan en benchmarks/resultados/<commit>.json y se comparan
+con la corrida anterior para ver regresiones entre commits.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+# Se mide el costo real de cada callback: sin caché de figuras ni vigilante
+os.environ.setdefault("TABLERO_CACHE_FIGURAS", "off")
+os.environ.setdefault("TABLERO_VIGILANCIA_SEG", "0")
+# Los datos sintéticos se publican después: la carga de data/ no debe pisarlos
+os.environ.setdefault("TABLERO_CARGA_DIFERIDA", "0")
+
+from plotly.io.json import to_json_plotly  # noqa: E402
+
+import app  # noqa: E402
+from benchmarks import sinteticos  # noqa: E402
+
+DIR_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# Umbral a partir del cual una diferencia se marca como regresión
+UMBRAL_REGRESION = 0.20
+
+
+def escenarios(datos):
+    """callback -> lista de argumentos con que se llama."""
+    municipio = sinteticos.municipios()[0]
+    categoria = datos.indicadores["Categoría"].iloc[0]
+    evento_muni = datos.sifilis["municipio"].iloc[0]
+    eps = datos.sifilis["eps"].dropna().iloc[0]
+    return {
+        "cargar_kpis": [(True, None)],
+        "actualizar_cpn_contenido": [("Todos", tipo, None) for tipo in ("resumen", "barras", "mapa_calor", "tabla")]
+                                    + [(municipio, "resumen", None)],
+        "actualizar_indicador_mapa_cpn": [("CPN_Completo",), ("CPN_Precoz",)],
+        "update_sifilis_graph": [("gestacional", None, None), ("congenita", evento_muni, None),
+                                 ("gestacional", evento_muni, eps)],
+        "actualizar_grafico": [(categoria, municipio, tipo) for tipo in ("Barras", "Línea", "Pastel")],
+        "mostrar_tabla_semaforo": [(municipio,)],
+        "actualizar_violencia_sexual": [(municipio, vista) for vista in ("grafico", "tabla", "tendencia")],
+        "actualizar_mapa_gestantes": [("Gestantes Activas",), ("Gestantes Adolescentes",)],
+    }
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def medir(funcion, argumentos, repeticiones):
+    # Calentamiento: imports perezosos de plotly, cachés internas de pandas
+    for args in argumentos:
+        funcion(*args)
+
+    tiempos = []
+    for _ in range(repeticiones):
+        for args in argumentos:
+            inicio = time.perf_counter()
+            funcion(*args)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    # Asignaciones en una pasada aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    asignado = []
+    for args in argumentos:
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        funcion(*args)
+        asignado.append(tracemalloc.get_traced_memory()[1] - antes)
+    tracemalloc.stop()
+
+    tamanos = [len(to_json_plotly(funcion(*args)).encode("utf-8")) for args in argumentos]
+
+    return {
+        "p50_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(percentil(tiempos, 95), 3),
+        "pico_kb": round(max(asignado) / 1024, 1),
+        "respuesta_kb": round(statistics.mean(tamanos) / 1024, 1),
+        "llamadas": len(tiempos),
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def resultado_anterior(excluir):
+    archivos = sorted(glob.glob(os.path.join(DIR_RESULTADOS, "*.json")), key=os.path.getmtime)
+    archivos = [a for a in archivos if os.path.abspath(a) != os.path.abspath(excluir)]
+    return archivos[-1] if archivos else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--anios", type=int, default=10, help="años de datos sintéticos")
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--solo", nargs="*", help="medir solo estos callbacks")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--salida", help="dónde guardar el JSON (por defecto resultados/<commit>.json)")
+    args = parser.parse_args()
+
+    fuentes = sinteticos.generar(anios=args.anios)
+    datos = app.registro.publicar(fuentes, version=f"bench-{args.anios}")
+    print("Filas: " + ", ".join(f"{n}={len(df):,}" for n, df in fuentes.items()))
+
+    resultados = {}
+    for nombre, argumentos in escenarios(datos).items():
+        # Solo los callbacks de los componentes habilitados
+        if (args.solo and nombre not in args.solo) or nombre not in app.contexto.callbacks:
+            continue
+        resultados[nombre] = medir(app.contexto.callbacks[nombre], argumentos, args.repeticiones)
+
+    salida = args.salida or os.path.join(DIR_RESULTADOS, f"{commit_actual()}.json")
+    anterior = args.comparar or resultado_anterior(salida)
+    previos = {}
+    if anterior and os.path.exists(anterior):
+        with open(anterior, encoding="utf-8") as f:
+            previos = json.load(f)["callbacks"]
+
+    print(f"\n{'callback':32} {'p50 ms':>9} {'p95 ms':>9} {'pico KB':>9} {'resp KB':>9}  vs. anterior")
+    for nombre, r in resultados.items():
+        cambio = ""
+        if nombre in previos and previos[nombre]["p50_ms"]:
+            delta = r["p50_ms"] / previos[nombre]["p50_ms"] - 1
+            cambio = f"{delta:+.0%}" + ("  <-- REGRESIÓN" if delta > UMBRAL_REGRESION else "")
+        print(f"{nombre:32} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['pico_kb']:9.1f} {r['respuesta_kb']:9.1f}  {cambio}")
+
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit_actual(),
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "anios": args.anios,
+            "filas": {n: len(df) for n, df in fuentes.items()},
+            "callbacks": resultados,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {os.path.relpath(salida, RAIZ)}")
+    if anterior:
+        print(f"Comparado con {os.path.relpath(anterior, RAIZ)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# benchmarks/carga.py
+"""Prueba de carga: usuarios concurrentes disparando los callbacks de gráficos.
+
+Uso (desde la raíz del repositorio):
+
+    # Levanta gunicorn con cada perfil, mide y compara
+    python benchmarks/carga.py --perfiles sync gthread gthread+pool --usuarios 16
+
+    # Contra un servidor ya levantado (mejor con TABLERO_CACHE_FIGURAS=off
+    # y TABLERO_RENDER_DIFERIDO=0, para que el layout traiga los filtros)
+    python benchmarks/carga.py --url http://127.0.0.1:8050 --usuarios 16
+
+Cada usuario elige al azar un callback y sus entradas, espera la respuesta y
+repite durante --duracion segundos. Se reportan peticiones por segundo,
+percentiles de latencia, rechazos (204 del pool sin cupo) y errores.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Variables de entorno de cada perfil (se suman a las comunes de lanzar())
+PERFILES = {
+    "sync": {"TABLERO_WORKER": "sync"},
+    "gthread": {"TABLERO_WORKER": "gthread", "TABLERO_HILOS": "4"},
+    "gthread+pool": {"TABLERO_WORKER": "gthread", "TABLERO_HILOS": "4", "TABLERO_FIGURAS_PROCESOS": "2"},
+    "gevent": {"TABLERO_WORKER": "gevent"},
+}
+
+
+def _opciones(layout, id_componente):
+    """Valores de las opciones de un dropdown del layout."""
+    pendientes = [layout]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, list):
+            pendientes.extend(nodo)
+        elif isinstance(nodo, dict):
+            props = nodo.get("props", {})
+            if props.get("id") == id_componente:
+                return [o["value"] if isinstance(o, dict) else o for o in props.get("options", [])]
+            pendientes.extend(v for v in props.values() if isinstance(v, (list, dict)))
+    return []
+
+
+def escenarios(url):
+    """Generadores de peticiones (cuerpo JSON de _dash-update-component)."""
+    with urllib.request.urlopen(f"{url}/_dash-layout") as r:
+        layout = json.load(r)
+    municipios = [m for m in _opciones(layout, "cpn-municipio-dropdown") if m != "Todos"] or ["POPAYAN"]
+    categorias = _opciones(layout, "categoria-dropdown") or ["Control Prenatal"]
+
+    def entrada(id_, prop, valor):
+        return {"id": id_, "property": prop, "value": valor}
+
+    def peticion(salida, entradas, estado=()):
+        id_, prop = salida.split(".")
+        return {"output": salida, "outputs": {"id": id_, "property": prop},
+                "inputs": list(entradas), "state": list(estado), "changedPropIds": []}
+
+    return [
+        lambda: peticion("grafico-indicadores.figure", [
+            entrada("categoria-dropdown", "value", random.choice(categorias)),
+            entrada("municipio-dropdown", "value", random.choice(municipios)),
+            entrada("tipo-grafico-dropdown", "value", random.choice(["Barras", "Línea", "Pastel"]))]),
+        lambda: peticion("contenido-violencia-sexual.children", [
+            entrada("vs-municipio-dropdown", "value", random.choice(municipios)),
+            entrada("vs-vista-dropdown", "value", "grafico")]),
+        lambda: peticion("cpn-contenido.children", [
+            entrada("cpn-municipio-dropdown", "value", random.choice(municipios + ["Todos"])),
+            entrada("cpn-tipo-dropdown", "value", random.choice(["barras", "mapa_calor"]))],
+            [entrada("cpn-indicador-dropdown", "value", None)]),
+        lambda: peticion("grafico-sifilis.figure", [
+            entrada("sifilis-tabs", "active_tab", random.choice(["gestacional", "congenita"])),
+            entrada("filtro-municipio", "value", random.choice(municipios + [None])),
+            entrada("filtro-eps", "value", None)]),
+    ]
+
+
+def medir(url, usuarios, duracion):
+    generadores = escenarios(url)
+    fin = time.monotonic() + duracion
+    tiempos, rechazos, errores = [], [0], [0]
+    lock = threading.Lock()
+
+    def usuario():
+        while time.monotonic() < fin:
+            cuerpo = json.dumps(random.choice(generadores)()).encode("utf-8")
+            pedido = urllib.request.Request(f"{url}/_dash-update-component", data=cuerpo,
+                                            headers={"Content-Type": "application/json"})
+            inicio = time.perf_counter()
+            try:
+                with urllib.request.urlopen(pedido, timeout=60) as r:
+                    r.read()
+                    estado = r.status
+            except (urllib.error.URLError, OSError):
+                estado = None
+            ms = (time.perf_counter() - inicio) * 1000
+            with lock:
+                if estado == 200:
+                    tiempos.append(ms)
+                elif estado == 204:
+                    rechazos[0] += 1
+                else:
+                    errores[0] += 1
+
+    hilos = [threading.Thread(target=usuario) for _ in range(usuarios)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    tiempos.sort()
+    return {
+        "peticiones_s": round(len(tiempos) / duracion, 1),
+        "p50_ms": round(statistics.median(tiempos), 1) if tiempos else None,
+        "p95_ms": round(tiempos[int(0.95 * (len(tiempos) - 1))], 1) if tiempos else None,
+        "rechazos": rechazos[0],
+        "errores": errores[0],
+    }
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def lanzar(perfil, workers):
+    """Levanta gunicorn con el perfil; devuelve (proceso, url) cuando ya responde."""
+    puerto = _puerto_libre()
+    entorno = dict(os.environ, PORT=str(puerto), WEB_CONCURRENCY=str(workers),
+                   TABLERO_CACHE_FIGURAS="off", TABLERO_RENDER_DIFERIDO="0",
+                   TABLERO_VIGILANCIA_SEG="0", TABLERO_METRICAS="0", **PERFILES[perfil])
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:server", "--config", "gunicorn.conf.py"],
+        cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{puerto}"
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"gunicorn terminó al arrancar con el perfil {perfil}")
+        try:
+            urllib.request.urlopen(f"{url}/_dash-layout", timeout=2).read()
+            return proceso, url
+        except OSError:
+            time.sleep(0.5)
+    proceso.terminate()
+    raise RuntimeError(f"gunicorn no respondió con el perfil {perfil}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="servidor ya levantado (si no, se usan --perfiles)")
+    parser.add_argument("--perfiles", nargs="*", default=["sync", "gthread+pool"], choices=sorted(PERFILES))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--usuarios", type=int, default=16)
+    parser.add_argument("--duracion", type=float, default=15)
+    parser.add_argument("--calentamiento", type=float, default=3)
+    args = parser.parse_args()
+
+    if args.url:
+        objetivos = [(args.url, None)]
+    else:
+        objetivos = [(None, perfil) for perfil in args.perfiles]
+
+    print(f"{'perfil':16} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'rechazos':>9} {'errores':>8}")
+    for url, perfil in objetivos:
+        proceso = None
+        try:
+            if perfil:
+                proceso, url = lanzar(perfil, args.workers)
+            medir(url, args.usuarios, args.calentamiento)
+            r = medir(url, args.usuarios, args.duracion)
+        finally:
+            if proceso:
+                proceso.terminate()
+                proceso.wait(timeout=30)
+        print(f"{perfil or url:16} {r['peticiones_s']:8.1f} {r['p50_ms'] or 0:9.1f} {r['p95_ms'] or 0:9.1f} "
+              f"{r['rechazos']:9d} {r['errores']:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/sinteticos.py
+"""Datos sintéticos con la forma de las fuentes reales, a escala de varios años.
+
+42 municipios × `anios` años, con granularidad semanal para sífilis.
+"""
+import numpy as np
+import pandas as pd
+
+from datos.geometria import codigos_dane
+
+CATEGORIAS = {
+    "Control Prenatal": ["Gestantes en cohorte", "Control prenatal últimos 45 días",
+                         "4+ controles en tercer trimestre", "Tamizaje ITS", "Consulta puerperio"],
+    "Planificación Familiar": ["MAC postparto/aborto", "Asesoría PF desde semana 28",
+                               "Cobertura de planificación familiar"],
+    "IVE": ["Consulta integral IVE", "IVE antes semana 15", "IVE con oportunidad (5 días)", "MAC post IVE"],
+    "Mortalidad": ["Mortalidad materna", "Mortalidad perinatal", "Mortalidad neonatal"],
+    "Violencia Sexual": ["Casos de violencia sexual notificados", "Casos de acceso carnal",
+                         "Casos de acoso sexual", "Casos de actos sexuales abusivos"],
+}
+EPS = ["NUEVA EPS", "SANITAS", "ASMET", "SOS", "COOSALUD", "EMSSANAR", "EPSS10", "AIC"]
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio",
+         "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+
+def municipios():
+    # Los 41 polígonos del TopoJSON más Guachené (creado después del mapa)
+    return sorted(codigos_dane()) + ["GUACHENE"]
+
+
+def generar(anios=10, semilla=0):
+    """Diccionario nombre lógico -> DataFrame, listo para registro.publicar()."""
+    rng = np.random.default_rng(semilla)
+    munis = municipios()
+    anio_final = 2025
+    anios_lista = list(range(anio_final - anios + 1, anio_final + 1))
+
+    # indicadores: municipio × año × indicador
+    filas = [(a, m, ind, cat) for a in anios_lista for m in munis
+             for cat, inds in CATEGORIAS.items() for ind in inds]
+    indicadores = pd.DataFrame(filas, columns=["Año", "Municipio", "Indicador", "Categoría"])
+    n = len(indicadores)
+    indicadores["Denominador"] = rng.integers(50, 5000, n)
+    indicadores["Numerador"] = (indicadores["Denominador"] * rng.uniform(0.3, 1.0, n)).astype(int)
+    indicadores["Valor (%)"] = indicadores["Numerador"] / indicadores["Denominador"] * 100
+    indicadores["Meta (%)"] = 100
+    indicadores = indicadores[["Año", "Municipio", "Indicador", "Numerador", "Denominador",
+                               "Valor (%)", "Meta (%)", "Categoría"]]
+
+    # cpn: una fila por municipio y año con indicadores porcentuales
+    cpn = pd.DataFrame([(m, a) for m in munis for a in anios_lista], columns=["Municipio", "Año"])
+    for col in ["CPN_Precoz", "CPN_Completo", "Suplementacion_Hierro", "Control_Odontologico"]:
+        cpn[col] = rng.uniform(55, 98, len(cpn))
+    cpn = cpn.drop(columns="Año")
+
+    gestantes = pd.DataFrame({
+        "Municipio": munis,
+        "Gestantes Activas": rng.integers(5, 1500, len(munis)),
+        "Gestantes Adolescentes": rng.integers(0, 300, len(munis)),
+    })
+
+    # sífilis: notificaciones semanales por municipio
+    semanas = pd.date_range(f"{anios_lista[0]}-01-01", f"{anio_final}-12-31", freq="W-MON")
+    base = pd.DataFrame([(f, m) for f in semanas for m in munis], columns=["fecha_notif", "municipio"])
+    base = base[rng.random(len(base)) < 0.6].reset_index(drop=True)
+    n = len(base)
+    gestacional = rng.random(n) < 0.8
+    sifilis = pd.DataFrame({
+        "evento": np.where(gestacional, "Sífilis Gestacional", "Sífilis Congénita"),
+        "tipo_caso": np.where(gestacional, "Gestante", "RN expuesto"),
+        "municipio": base["municipio"],
+        "eps": rng.choice(EPS, n),
+        "fecha_notif": base["fecha_notif"],
+        "semana": base["fecha_notif"].dt.isocalendar().week.astype(int).to_numpy(),
+        "mes": np.array(MESES, dtype=object)[base["fecha_notif"].dt.month.to_numpy() - 1],
+        "casos": rng.integers(1, 6, n),
+        "edad": rng.uniform(14, 45, n).round(),
+        "sem_gestacion": rng.uniform(4, 40, n).round(),
+        "seguimiento": "",
+    })
+
+    return {"indicadores": indicadores, "cpn": cpn, "gestantes": gestantes, "sifilis": sifilis}
@@ -0,0 +1,176 @@
+# cache_figuras.py
+"""Caché de las salidas de los callbacks (figuras y componentes ya serializados).
+
+La clave es (callback, valores de entrada, versión de datos), así una recarga
+de datos nunca devuelve figuras viejas. Hay dos almacenes:
+
+* memoria: un OrderedDict por proceso con desalojo LRU.
+* disco: un archivo JSON por entrada, compartido por todos los workers.
+
+Ambos respetan un tamaño máximo y un TTL en segundos.
+"""
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from plotly.io.json import to_json_plotly
+
+
+class CacheMemoria:
+    def __init__(self, max_entradas, ttl):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            valor, creado = entrada
+            if time.monotonic() - creado > self.ttl:
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic())
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def vaciar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class CacheDisco:
+    """Un archivo por entrada; su mtime marca el último uso (para el LRU)."""
+
+    def __init__(self, directorio, max_entradas, ttl):
+        self.directorio = directorio
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._escrituras = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, hashlib.sha1(clave.encode("utf-8")).hexdigest() + ".json")
+
+    def obtener(self, clave):
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                creado = float(f.readline())
+                if time.time() - creado > self.ttl:
+                    os.remove(ruta)
+                    return None
+                valor = f.read()
+            os.utime(ruta)  # marca el uso para el desalojo LRU
+            return valor
+        except (OSError, ValueError):
+            return None
+
+    def guardar(self, clave, valor):
+        fd, tmp = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # Primera línea: momento de creación, para el TTL
+            f.write(f"{time.time()}\n")
+            f.write(valor)
+        os.replace(tmp, self._ruta(clave))
+
+        # Revisar el tamaño en cada escritura sería costoso; basta cada tanto
+        self._escrituras += 1
+        if self._escrituras % 32 == 0:
+            self._desalojar()
+
+    def _desalojar(self):
+        try:
+            entradas = [e for e in os.scandir(self.directorio) if e.name.endswith(".json")]
+        except OSError:
+            return
+        sobrantes = len(entradas) - self.max_entradas
+        if sobrantes > 0:
+            entradas.sort(key=lambda e: e.stat().st_mtime)
+            for e in entradas[:sobrantes]:
+                try:
+                    os.remove(e.path)
+                except OSError:
+                    pass
+
+    def vaciar(self):
+        for e in os.scandir(self.directorio):
+            if not e.name.endswith(".json"):
+                continue
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return sum(1 for e in os.scandir(self.directorio) if e.name.endswith(".json"))
+
+
+class CacheFiguras:
+    """Memoriza callbacks guardando su salida como JSON."""
+
+    def __init__(self, almacen, version):
+        self.almacen = almacen
+        self._version = version
+        self.aciertos = Counter()
+        self.fallos = Counter()
+
+    def memoizar(self, nombre):
+        def decorador(funcion):
+            if self.almacen is None:
+                return funcion
+
+            @functools.wraps(funcion)
+            def envoltura(*args):
+                clave = json.dumps([nombre, self._version(), args], default=str, ensure_ascii=False)
+                valor = self.almacen.obtener(clave)
+                if valor is not None:
+                    self.aciertos[nombre] += 1
+                    # Dash acepta tanto la figura/componente como su forma JSON
+                    return json.loads(valor)
+
+                self.fallos[nombre] += 1
+                resultado = funcion(*args)
+                try:
+                    self.almacen.guardar(clave, to_json_plotly(resultado))
+                except Exception as e:
+                    print(f"No se pudo guardar en caché {nombre}: {e}")
+                return resultado
+
+            return envoltura
+        return decorador
+
+    def vaciar(self):
+        if self.almacen is not None:
+            self.almacen.vaciar()
+
+    def estadisticas(self):
+        return {
+            nombre: {"aciertos": self.aciertos[nombre], "fallos": self.fallos[nombre]}
+            for nombre in sorted(set(self.aciertos) | set(self.fallos))
+        }
+
+
+def crear_almacen(tipo, directorio, max_entradas, ttl):
+    """Almacén según la configuración: "memoria", "disco" u "off"."""
+    if tipo == "disco":
+        return CacheDisco(directorio, max_entradas, ttl)
+    if tipo == "memoria":
+        return CacheMemoria(max_entradas, ttl)
+    return None
@@ -0,0 +1,53 @@
+# components/__init__.py
+"""Registro de componentes del tablero.
+
+Cada módulo de este paquete es una sección de la página y declara:
+
+* SECCION: nombre de la sección (marcador del render diferido y clave de caché).
+* DIFERIBLE: True si va debajo del pliegue (con render diferido se arma al
+  acercarse a la vista); False si va siempre en el layout.
+* DATOS: fuentes de la instantánea que lee. Solo se cargan las fuentes de
+  los componentes habilitados; las demás quedan vacías.
+* CACHE: callback -> política de caché. "figuras": la salida se guarda en la
+  caché de figuras por versión de datos y el precalentamiento puede llamarlo.
+  Los callbacks que no figuran no se memorizan (baratos o devuelven un Patch).
+* render(datos): contenido de la sección con la instantánea vigente.
+* registrar(contexto): callbacks, con los servicios de components.contexto.
+* vistas_por_defecto(datos) (opcional): [(callback, args)] de la página
+  recién abierta, para el precalentamiento.
+
+Solo se importan los módulos habilitados en config.COMPONENTES.
+"""
+import importlib
+
+# Orden en la página
+DISPONIBLES = ("kpis", "control_prenatal", "grafico_categoria", "semaforo_municipal",
+               "violencia", "gestantes", "sifilis", "mapa_violencia")
+
+POLITICAS = ("figuras",)
+
+
+def cargar(nombres):
+    """Módulos habilitados, en el orden de DISPONIBLES."""
+    desconocidos = set(nombres) - set(DISPONIBLES)
+    if desconocidos:
+        raise ValueError(f"Componentes desconocidos: {', '.join(sorted(desconocidos))}")
+    return [importlib.import_module(f"{__name__}.{nombre}") for nombre in DISPONIBLES if nombre in nombres]
+
+
+def fuentes(modulos):
+    """Fuentes que hay que cargar para los componentes dados."""
+    return {fuente for modulo in modulos for fuente in modulo.DATOS}
+
+
+def politicas(modulos, **propias):
+    """callback -> política de caché de todos los componentes (más las de app.py)."""
+    resultado = dict(propias)
+    for modulo in modulos:
+        for callback, politica in modulo.CACHE.items():
+            if politica not in POLITICAS:
+                raise ValueError(f"{modulo.__name__}: política de caché desconocida para {callback}: {politica}")
+            if callback in resultado:
+                raise ValueError(f"{modulo.__name__}: el callback {callback} ya está declarado")
+            resultado[callback] = politica
+    return resultado
@@ -0,0 +1,203 @@
+# components/contexto.py
+"""Servicios compartidos por los componentes: datos, caché, tablas y exportación.
+
+Un solo Contexto por aplicación. Los componentes no leen Excel ni arman
+cachés propias: leen la instantánea vigente con datos(), registran sus
+callbacks con callback() (que aplica la política de caché declarada en
+CACHE) y sus tablas con tabla().
+"""
+import functools
+from urllib.parse import urlencode
+
+from dash import get_relative_path, html
+from dash.dependencies import ClientsideFunction, Input, Output, State
+import dash_bootstrap_components as dbc
+
+from datos.tablas import TablaPaginada
+from instrumentacion import metricas
+
+# Filas por página de los DataTable en modo custom
+TAMANO_PAGINA = 15
+
+
+class Contexto:
+    def __init__(self, app, registro, figuras, pool_figuras, politicas):
+        """politicas: callback -> política de caché (components.politicas)."""
+        self.app = app
+        self.registro = registro
+        self.figuras = figuras
+        self.pool_figuras = pool_figuras
+        self.politicas = politicas
+        self.callbacks = {}       # nombre -> función registrada (ya con su caché)
+        self.precalentables = {}  # nombre -> función memorizada
+        self._tablas = {}         # vista -> (filas(datos, municipio), municipio por defecto)
+        self._exportaciones = {}  # vista -> filas(datos, parametros)
+
+        # Una TablaPaginada por (versión de datos, vista, municipio)
+        self.tabla_paginada = functools.lru_cache(maxsize=64)(self._tabla_paginada)
+        registro.al_publicar(lambda _: self.tabla_paginada.cache_clear())
+
+    def datos(self):
+        """Instantánea vigente; un callback la pide una vez y trabaja con ella."""
+        return self.registro.actual()
+
+    # --- callbacks y caché ----------------------------------------------
+
+    def cacheado(self, funcion):
+        """La función con la política de caché declarada para su nombre."""
+        nombre = funcion.__name__
+        if self.politicas.get(nombre) == "figuras":
+            funcion = self.figuras.memoizar(nombre)(funcion)
+            if self.figuras.almacen is not None:
+                self.precalentables[nombre] = funcion
+        self.callbacks[nombre] = funcion
+        return funcion
+
+    def callback(self, *args, **kwargs):
+        """app.callback con la caché que corresponde al callback."""
+        def decorador(funcion):
+            return self.app.callback(*args, **kwargs)(self.cacheado(funcion))
+        return decorador
+
+    def alternar(self, seccion):
+        """Botón toggle-<seccion> que abre y cierra collapse-<seccion>, en el navegador."""
+        self.app.clientside_callback(
+            """
+            function(n, is_open) {
+                return n ? !is_open : is_open;
+            }
+            """,
+            Output(f"collapse-{seccion}", "is_open"),
+            Input(f"toggle-{seccion}", "n_clicks"),
+            State(f"collapse-{seccion}", "is_open")
+        )
+
+    # --- tablas paginadas en el servidor ---------------------------------
+    # Los DataTable van en modo "custom": al navegador solo viaja la página
+    # visible; el orden y el filtro se resuelven aquí sobre la TablaPaginada.
+
+    def _tabla_paginada(self, datos, vista, municipio):
+        filas, _ = self._tablas[vista]
+        return TablaPaginada(filas(datos, municipio))
+
+    def tabla(self, vista, id_tabla, id_municipio, filas, municipio_defecto=None):
+        """Registra un DataTable paginado filtrado por el dropdown `id_municipio`.
+
+        filas(datos, municipio) da todas las filas de la tabla; con ellas se
+        sirven las páginas, el orden, el filtro y la descarga de la vista.
+        """
+        self._tablas[vista] = (filas, municipio_defecto)
+
+        @self.app.callback(
+            [Output(id_tabla, "data"),
+             Output(id_tabla, "page_count"),
+             Output(id_tabla, "page_current")],
+            [Input(id_tabla, "page_current"),
+             Input(id_tabla, "page_size"),
+             Input(id_tabla, "sort_by"),
+             Input(id_tabla, "filter_query")],
+            State(id_municipio, "value"),
+            prevent_initial_call=True
+        )
+        def paginar_tabla(pagina, tamano, sort_by, filter_query, municipio):
+            tabla = self.tabla_paginada(self.datos(), vista, municipio)
+            with metricas.fase("filtro"):
+                return tabla.pagina(pagina, tamano or TAMANO_PAGINA, sort_by, filter_query)
+
+        # Enlaces de descarga: siguen el filtro y el orden de la tabla (assets/exportar.js)
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="exportar", function_name="tabla"),
+            [Output(f"{id_tabla}-csv", "href"),
+             Output(f"{id_tabla}-xlsx", "href")],
+            [Input(id_tabla, "filter_query"),
+             Input(id_tabla, "sort_by")],
+            [State(f"{id_tabla}-csv", "href"),
+             State(f"{id_tabla}-xlsx", "href")],
+            prevent_initial_call=True
+        )
+
+    def primera_pagina(self, vista, municipio):
+        """Propiedades de un DataTable en modo custom, con la primera página ya cargada."""
+        data, paginas, _ = self.tabla_paginada(self.datos(), vista, municipio).pagina(0, TAMANO_PAGINA)
+        return dict(
+            data=data, page_count=paginas, page_current=0, page_size=TAMANO_PAGINA,
+            page_action="custom", sort_action="custom", sort_mode="single",
+            filter_action="custom", filter_query=""
+        )
+
+    # --- exportación -----------------------------------------------------
+
+    def exportacion(self, vista, filas):
+        """Vista descargable fuera de una tabla: filas(datos, parametros) -> DataFrame."""
+        self._exportaciones[vista] = filas
+
+    def filas_exportacion(self, vista, parametros):
+        """Filas de la vista tal como se ven en el tablero (filtro y orden incluidos)."""
+        datos = self.datos()
+        if vista in self._exportaciones:
+            return self._exportaciones[vista](datos, parametros)
+        if vista not in self._tablas:
+            return None
+        municipio = parametros.get("municipio") or self._tablas[vista][1]
+        if municipio is None:
+            return None
+        orden = parametros.get("orden")
+        sort_by = [{"column_id": orden, "direction": parametros.get("dir", "asc")}] if orden else None
+        return self.tabla_paginada(datos, vista, municipio).filas(sort_by, parametros.get("filtro", ""))
+
+
+# === CONTENEDORES ===
+
+def enlaces_exportacion(id_base, vista, **parametros):
+    """Botones de descarga CSV/XLSX; el filtro de la tabla se agrega en el navegador."""
+    consulta = urlencode({k: v for k, v in parametros.items() if v})
+    return html.Div([
+        html.A([html.I(className="fas fa-download me-1"), formato.upper()],
+               id=f"{id_base}-{formato}",
+               href=get_relative_path(f"/exportar/{vista}.{formato}") + (f"?{consulta}" if consulta else ""),
+               className="btn btn-outline-secondary btn-sm ms-2")
+        for formato in ("csv", "xlsx")
+    ], className="d-flex justify-content-end mb-2")
+
+
+def plegable(seccion, boton, encabezado, cuerpo, abierto):
+    """Botón toggle-<seccion> y tarjeta dentro de collapse-<seccion>.
+
+    boton: (icono, texto, color); encabezado: (icono, texto, clases).
+    """
+    icono_boton, texto_boton, color = boton
+    icono, titulo, clases = encabezado
+    return dbc.Row([
+        dbc.Col([
+            dbc.Button([
+                html.I(className=f"{icono_boton} me-2"),
+                texto_boton
+            ], id=f"toggle-{seccion}", color=color, className="mb-2 w-100")
+        ], width=12),
+        dbc.Col([
+            dbc.Collapse([
+                dbc.Card([
+                    dbc.CardHeader([
+                        html.I(className=f"{icono} me-2"),
+                        titulo
+                    ], className=clases),
+                    cuerpo
+                ], className="shadow-sm")
+            ], id=f"collapse-{seccion}", is_open=abierto)
+        ], width=12)
+    ], className="mb-4")
+
+
+def tarjeta(icono, titulo, clases, cuerpo):
+    """Sección a lo ancho con encabezado de color."""
+    return dbc.Row([
+        dbc.Col([
+            dbc.Card([
+                dbc.CardHeader([
+                    html.I(className=f"{icono} me-2"),
+                    titulo
+                ], className=clases),
+                dbc.CardBody(cuerpo)
+            ], className="shadow-sm")
+        ], width=12)
+    ], className="mb-4")
\ No newline at end of file
@@ -1,75 +1,238 @@
 # components/control_prenatal.py
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.express as px
+"""Control prenatal (CPN): resumen, barras, mapa de calor y tabla por municipio."""
+from dash import html, dcc, dash_table, Patch, no_update
+from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
 
-def render(df_cpn):
-    """Renderiza los controles y contenedor para Control Prenatal (CPN)."""
-    # municipios disponibles
-    municipios = sorted(df_cpn["Municipio"].unique())
+from arranque import perezoso
+import graficos
+from components.contexto import enlaces_exportacion, plegable
+from datos import esquema
+from instrumentacion import metricas
+
+pd = perezoso("pandas")
+
+SECCION = "cpn"
+DIFERIBLE = False
+DATOS = ("cpn",)
+CACHE = {"actualizar_cpn_contenido": "figuras"}
+
+
+def columnas_indicador_cpn(df_cpn):
+    """Columnas numéricas de CPN que se pueden mostrar en el mapa de calor"""
+    columnas_numericas = df_cpn.select_dtypes(include=['number']).columns
+    # Filtrar columnas que no sean ID o códigos
+    return [col for col in columnas_numericas if col.lower() not in ['id', 'codigo', 'municipio']]
+
+
+def crear_componente_cpn(datos):
+    """Crear el componente de indicadores CPN mejorado con mapa de calor"""
+    df_cpn = datos.cpn
+    municipios_cpn = esquema.valores(df_cpn['Municipio']) if 'Municipio' in df_cpn.columns else []
 
     return html.Div([
         dbc.Row([
             dbc.Col([
-                html.Label("Municipio:", className="fw-bold"),
+                html.Label("Seleccionar Municipio:", className="fw-bold"),
                 dcc.Dropdown(
                     id="cpn-municipio-dropdown",
-                    options=[{"label": m, "value": m} for m in municipios],
-                    value=municipios[0],
-                    clearable=False,
-                    className="mb-3"
+                    options=[{"label": "Todos", "value": "Todos"}] + datos.opciones_municipio(municipios_cpn),
+                    value="Todos",
+                    clearable=False
                 )
-            ], width=6),
+            ], width=4),
             dbc.Col([
-                html.Label("Tipo de gráfico:", className="fw-bold"),
+                html.Label("Tipo de Visualización:", className="fw-bold"),
                 dcc.Dropdown(
                     id="cpn-tipo-dropdown",
                     options=[
-                        {"label": "📊 Barras", "value": "Barras"},
-                        {"label": "📈 Líneas", "value": "Línea"},
-                        {"label": "🥧 Pastel", "value": "Pastel"},
-                        {"label": "📋 Tabla",  "value": "Tabla"}
+                        {"label": "📊 Indicadores Resumen", "value": "resumen"},
+                        {"label": "📈 Gráfico de Barras", "value": "barras"},
+                        {"label": "🗺️ Mapa de Calor", "value": "mapa_calor"},
+                        {"label": "📋 Tabla Detallada", "value": "tabla"}
                     ],
-                    value="Barras",
+                    value="resumen",
+                    clearable=False
+                )
+            ], width=4),
+            dbc.Col([
+                html.Label("Indicador para Mapa:", className="fw-bold"),
+                dcc.Dropdown(
+                    id="cpn-indicador-dropdown",
+                    options=[],
+                    value=None,
                     clearable=False,
-                    className="mb-3"
+                    style={"display": "none"}
                 )
-            ], width=6),
+            ], width=4, id="col-indicador"),
+            # Opciones del mapa de calor: viajan una vez con el layout
+            dcc.Store(id="cpn-indicadores-opciones", data=[
+                {"label": col.replace('_', ' ').title(), "value": col} for col in columnas_indicador_cpn(df_cpn)
+            ])
         ], className="mb-4"),
 
         html.Div(id="cpn-contenido")
-    ], className="mb-5")
+    ])
 
 
-def register_callbacks(app, df_cpn):
-    @app.callback(
+def render(datos):
+    return plegable(
+        SECCION,
+        ("fas fa-baby", "Control Prenatal (CPN)", "warning"),
+        ("fas fa-user-md", "Control Prenatal - Gestantes", "bg-warning text-dark"),
+        dbc.CardBody(crear_componente_cpn(datos)),
+        abierto=True
+    )
+
+
+def filas_tabla(datos, municipio):
+    df_cpn = datos.cpn
+    if municipio != "Todos" and 'Municipio' in df_cpn.columns:
+        df_cpn = df_cpn[df_cpn['Municipio'] == municipio]
+    return datos.con_nombres(df_cpn.round(1))
+
+
+def vistas_por_defecto(datos):
+    return [("actualizar_cpn_contenido", ["Todos", "resumen", None])]
+
+
+def registrar(contexto):
+    contexto.alternar(SECCION)
+    contexto.tabla("cpn", "cpn-tabla", "cpn-municipio-dropdown", filas_tabla, municipio_defecto="Todos")
+
+    # Mostrar/ocultar dropdown de indicador para mapa de calor
+    contexto.app.clientside_callback(
+        """
+        function(tipo_viz, opciones) {
+            if (tipo_viz !== "mapa_calor") {
+                return [{display: "none"}, [], null];
+            }
+            opciones = opciones || [];
+            if (!opciones.length) {
+                return [{display: "block"}, [{label: "Sin datos", value: ""}], ""];
+            }
+            return [{display: "block"}, opciones, opciones[0].value];
+        }
+        """,
+        [Output("cpn-indicador-dropdown", "style"),
+         Output("cpn-indicador-dropdown", "options"),
+         Output("cpn-indicador-dropdown", "value")],
+        Input("cpn-tipo-dropdown", "value"),
+        State("cpn-indicadores-opciones", "data")
+    )
+
+    # Contenido CPN actualizado
+    @contexto.callback(
         Output("cpn-contenido", "children"),
-        Input("cpn-municipio-dropdown", "value"),
-        Input("cpn-tipo-dropdown", "value")
+        [Input("cpn-municipio-dropdown", "value"),
+         Input("cpn-tipo-dropdown", "value")],
+        State("cpn-indicador-dropdown", "value")
+    )
+    def actualizar_cpn_contenido(municipio, tipo_viz, indicador_mapa):
+        datos = contexto.datos()
+        df_cpn = datos.cpn
+
+        # Promedios precalculados del municipio (una fila de la matriz, sin filtrar)
+        with metricas.fase("filtro"):
+            promedios = datos.resumen_cpn.fila(municipio)
+
+        if promedios is None:
+            # "Todos" solo falta cuando la fuente no tiene filas
+            if municipio == "Todos":
+                return dbc.Alert("No hay datos de CPN disponibles", color="warning")
+            return dbc.Alert(f"No hay datos para {datos.nombre_municipio(municipio)}", color="info")
+
+        if tipo_viz == "resumen":
+            tarjetas = []
+
+            for etiqueta, valor in zip(datos.resumen_cpn.etiquetas, promedios):
+                # Color según valor
+                if valor >= 90:
+                    color, icono = "success", "fas fa-check-circle"
+                elif valor >= 70:
+                    color, icono = "warning", "fas fa-exclamation-triangle"
+                else:
+                    color, icono = "danger", "fas fa-times-circle"
+
+                tarjeta = dbc.Card([
+                    dbc.CardBody([
+                        html.Div([
+                            html.I(className=f"{icono} fa-2x mb-2", style={"color": f"var(--bs-{color})"})
+                        ], className="text-center"),
+                        html.H4(f"{valor:.1f}%", className="text-center mb-1"),
+                        html.P(etiqueta, className="text-center text-muted mb-0")
+                    ])
+                ], outline=True, color=color, className="h-100")
+
+                tarjetas.append(dbc.Col(tarjeta, width=3))
+
+            return dbc.Row(tarjetas) if tarjetas else dbc.Alert("No se encontraron indicadores", color="warning")
+
+        elif tipo_viz == "barras":
+            if len(promedios) == 0:
+                return dbc.Alert("No hay datos numéricos", color="warning")
+
+            with metricas.fase("figura"):
+                fig = contexto.pool_figuras.ejecutar(
+                    graficos.figura_barras_cpn,
+                    pd.DataFrame({"Indicador": datos.resumen_cpn.etiquetas, "Valor": promedios}),
+                    datos.nombre_municipio(municipio)
+                )
+            return dcc.Graph(figure=fig)
+
+        elif tipo_viz == "mapa_calor":
+            # Municipio es opcional en el contrato de cpn (hay resúmenes por indicador)
+            if not datos.resumen_cpn.por_municipio:
+                return dbc.Alert("No se encontró la columna 'Municipio' en los datos", color="danger")
+
+            # El indicador llega como State: al cambiarlo solo se envía un Patch
+            # (actualizar_indicador_mapa_cpn); aquí se arma la figura completa
+            columnas = columnas_indicador_cpn(df_cpn)
+            if indicador_mapa not in columnas:
+                indicador_mapa = columnas[0] if columnas else None
+            if not indicador_mapa:
+                return dbc.Alert("Selecciona un indicador para el mapa de calor", color="info")
+
+            # Usar todos los datos de CPN para el mapa
+            with metricas.fase("figura"):
+                fig = contexto.pool_figuras.ejecutar(graficos.figura_mapa_calor_cpn,
+                                                     datos.con_nombres(df_cpn[["Municipio", indicador_mapa]]),
+                                                     indicador_mapa)
+            return dcc.Graph(id="cpn-mapa-calor", figure=fig)
+
+        elif tipo_viz == "tabla":
+            return html.Div([enlaces_exportacion("cpn-tabla", "cpn", municipio=municipio), dash_table.DataTable(
+                id="cpn-tabla",
+                columns=[{"name": col.replace('_', ' ').title(), "id": col} for col in df_cpn.columns],
+                **contexto.primera_pagina("cpn", municipio),
+                style_cell={'textAlign': 'center', 'padding': '12px'},
+                style_header={
+                    'backgroundColor': '#ffc107',
+                    'color': 'black',
+                    'fontWeight': 'bold',
+                    'border': '1px solid #dee2e6'
+                },
+                style_data={
+                    'border': '1px solid #dee2e6'
+                },
+                style_data_conditional=[
+                    {
+                        'if': {'row_index': 'odd'},
+                        'backgroundColor': '#f8f9fa'
+                    }
+                ]
+            )])
+
+        return dbc.Alert("Selecciona un tipo de visualización", color="info")
+
+    # Cambio de indicador en el mapa de calor: solo viajan los valores nuevos
+    @contexto.callback(
+        Output("cpn-mapa-calor", "figure"),
+        Input("cpn-indicador-dropdown", "value"),
+        prevent_initial_call=True
     )
-    def actualizar_cpn(municipio, tipo):
-        dff = df_cpn[df_cpn["Municipio"] == municipio]
-
-        if tipo == "Tabla":
-            return dbc.Table.from_dataframe(
-                dff, striped=True, bordered=True, hover=True
-            )
-
-        if tipo == "Pastel":
-            fig = px.pie(
-                dff, names="Indicador", values="Valor (%)",
-                title=f"CPN en {municipio}"
-            )
-        elif tipo == "Línea":
-            fig = px.line(
-                dff, x="Año", y="Valor (%)",
-                title=f"Tendencia CPN en {municipio}"
-            )
-        else:  # Barras
-            fig = px.bar(
-                dff, x="Indicador", y="Valor (%)",
-                title=f"Control Prenatal en {municipio}"
-            )
-
-        return dcc.Graph(figure=fig)
+    def actualizar_indicador_mapa_cpn(indicador):
+        datos = contexto.datos()
+        if not datos.resumen_cpn.por_municipio or indicador not in columnas_indicador_cpn(datos.cpn):
+            return no_update
+        return graficos.parchar_mapa_calor_cpn(Patch(), datos.cpn, indicador)
@@ -0,0 +1,55 @@
+# components/gestantes.py
+"""Mapa de gestantes por municipio.
+
+La geometría y el layout llegan una sola vez con la sección; al cambiar de
+indicador solo se envían los valores z y los títulos (Patch).
+"""
+from dash import html, dcc, Patch, no_update
+from dash.dependencies import Input, Output
+import dash_bootstrap_components as dbc
+
+import graficos
+
+SECCION = "gestantes"
+DIFERIBLE = True
+DATOS = ("gestantes",)
+CACHE = {}
+
+
+def crear_mapa_gestantes_indicador(df_cpn2):
+    """Selector de indicador y mapa de gestantes; la geometría viaja solo aquí"""
+    indicadores = list(df_cpn2.select_dtypes(include="number").columns)
+    if df_cpn2.empty:
+        contenido = dbc.Alert("No hay datos disponibles para generar el mapa de calor", color="warning")
+    else:
+        contenido = dcc.Graph(id="gestantes-mapa", figure=graficos.figura_mapa_gestantes(df_cpn2, indicadores[0]))
+
+    return html.Div([
+        dcc.Dropdown(
+            id="gestantes-indicador-dropdown",
+            options=[{"label": col, "value": col} for col in indicadores],
+            value=indicadores[0] if indicadores else None,
+            placeholder="Selecciona un indicador"
+        ),
+        html.Div(contenido, id="gestantes-mapa-contenido")
+    ])
+
+
+def render(datos):
+    return dbc.Card([
+        dbc.CardHeader("Mapa de Gestantes"),
+        dbc.CardBody(crear_mapa_gestantes_indicador(datos.con_nombres(datos.gestantes)))
+    ], className="mb-3")
+
+
+def registrar(contexto):
+    @contexto.callback(
+        Output("gestantes-mapa", "figure"),
+        Input("gestantes-indicador-dropdown", "value"),
+        prevent_initial_call=True
+    )
+    def actualizar_mapa_gestantes(indicador):
+        df_cpn2 = contexto.datos().gestantes
+        if not indicador or indicador not in df_cpn2.columns:
+            return no_update
+        return graficos.parchar_mapa_gestantes(Patch(), df_cpn2, indicador)
@@ -1,67 +1,98 @@
-from dash import dcc, html
+# components/grafico_categoria.py
+"""Gráfico de los indicadores de una categoría en un municipio."""
+from dash import html, dcc
 from dash.dependencies import Input, Output
-import plotly.express as px
 import dash_bootstrap_components as dbc
 
-def render(df):
-    categorias = sorted(df["Categoría"].unique())
-    municipios = sorted(df["Municipio"].unique())
+from arranque import perezoso
+import graficos
+from components.contexto import tarjeta
+from datos import esquema
+from instrumentacion import metricas
+
+px = perezoso("plotly.express")
+
+SECCION = "categoria"
+DIFERIBLE = True
+DATOS = ("indicadores",)
+CACHE = {"actualizar_grafico": "figuras"}
+
+
+def crear_grafico_categoria(datos):
+    """Crear componente de gráfico por categoría"""
+    df = datos.indicadores
+    categorias = esquema.valores(df['Categoría'])
+    municipios = esquema.valores(df['Municipio'])
 
     return html.Div([
         dbc.Row([
             dbc.Col([
                 html.Label("Categoría:", className="fw-bold"),
                 dcc.Dropdown(
-                    id="gc-categoria-dropdown",
+                    id="categoria-dropdown",
                     options=[{"label": c, "value": c} for c in categorias],
-                    value=categorias[0],
-                    clearable=False,
-                    className="mb-3"
+                    value=categorias[0] if categorias else None
                 )
             ], width=4),
             dbc.Col([
                 html.Label("Municipio:", className="fw-bold"),
                 dcc.Dropdown(
-                    id="gc-municipio-dropdown",
-                    options=[{"label": m, "value": m} for m in municipios],
-                    value=municipios[0],
-                    clearable=False,
-                    className="mb-3"
+                    id="municipio-dropdown",
+                    options=datos.opciones_municipio(municipios),
+                    value=municipios[0] if municipios else None
                 )
             ], width=4),
             dbc.Col([
-                html.Label("Tipo:", className="fw-bold"),
+                html.Label("Tipo de Gráfico:", className="fw-bold"),
                 dcc.Dropdown(
-                    id="gc-tipo-dropdown",
+                    id="tipo-grafico-dropdown",
                     options=[
-                        {"label": "Barras", "value": "Barras"},
-                        {"label": "Línea",  "value": "Línea"},
-                        {"label": "Pastel", "value": "Pastel"}
+                        {"label": "📊 Barras", "value": "Barras"},
+                        {"label": "📈 Línea", "value": "Línea"},
+                        {"label": "🥧 Pastel", "value": "Pastel"}
                     ],
-                    value="Barras",
-                    clearable=False,
-                    className="mb-3"
+                    value="Barras"
                 )
             ], width=4)
-        ]),
-        dcc.Loading(dcc.Graph(id="gc-graph"), type="circle")
-    ], className="mb-5")
+        ], className="mb-4"),
+
+        dcc.Graph(id="grafico-indicadores")
+    ])
+
+
+def render(datos):
+    return tarjeta("fas fa-chart-bar", "Análisis por Categoría y Municipio", "bg-info text-white",
+                   crear_grafico_categoria(datos))
 
 
-def register_callbacks(app, df):
-    @app.callback(
-        Output("gc-graph", "figure"),
-        Input("gc-categoria-dropdown", "value"),
-        Input("gc-municipio-dropdown", "value"),
-        Input("gc-tipo-dropdown", "value")
+def vistas_por_defecto(datos):
+    df = datos.indicadores
+    if df.empty:
+        return []
+    return [("actualizar_grafico", [esquema.valores(df["Categoría"])[0], esquema.valores(df["Municipio"])[0], "Barras"])]
+
+
+def registrar(contexto):
+    @contexto.callback(
+        Output("grafico-indicadores", "figure"),
+        [Input("categoria-dropdown", "value"),
+         Input("municipio-dropdown", "value"),
+         Input("tipo-grafico-dropdown", "value")]
     )
-    def actualizar_gc(categoria, municipio, tipo):
-        dff = df[(df["Categoría"] == categoria) & (df["Municipio"] == municipio)]
-        if tipo == "Pastel":
-            return px.pie(dff, names="Indicador", values="Valor (%)",
-                          title=f"{categoria} en {municipio}")
-        if tipo == "Línea":
-            return px.line(dff, x="Año", y="Valor (%)",
-                           title=f"{categoria} en {municipio}")
-        return px.bar(dff, x="Indicador", y="Valor (%)",
-                      title=f"{categoria} en {municipio}")
+    def actualizar_grafico(categoria, municipio, tipo):
+        datos = contexto.datos()
+        if not categoria or not municipio:
+            return px.bar(title="Selecciona categoría y municipio")
+
+        with metricas.fase("filtro"):
+            df_filtrado = datos.por_categoria_municipio.filas(categoria, municipio)
+
+        if df_filtrado.empty:
+            return px.bar(title=f"No hay datos para {categoria} - {datos.nombre_municipio(municipio)}")
+
+        titulo = f"{categoria} - {datos.nombre_municipio(municipio)}"
+
+        with metricas.fase("figura"):
+            fig = contexto.pool_figuras.ejecutar(graficos.figura_categoria, df_filtrado[["Indicador", "Valor (%)"]],
+                                                 titulo, tipo)
+        return fig
@@ -1,29 +1,99 @@
-from dash import html
-from dash.dependencies import Input, Output
+# components/kpis.py
+"""Panel plegable de indicadores clave (valores precalculados en datos/kpis.py)."""
+from dash import html, no_update
+from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
 
-def render(df):
-    return html.Div(id="kpi-cards-container", className="mb-5")
+from arranque import perezoso
+import config
+from components.contexto import plegable
 
-def register_callbacks(app, df):
-    @app.callback(
-        Output("kpi-cards-container", "children"),
-        Input("gc-graph", "figure")  # un “trigger” cualquiera para lanzar la actualización
+pd = perezoso("pandas")
+
+SECCION = "kpi"
+DIFERIBLE = False
+DATOS = ("indicadores",)
+CACHE = {}
+
+
+def crear_kpis(kpis):
+    """Crear indicadores clave a partir de los valores precalculados (datos/kpis.py)"""
+    if kpis is not None:
+        cobertura_cpn, parto_inst = kpis["cobertura_cpn"], kpis["parto_inst"]
+        casos_vs, municipios = kpis["casos_vs"], kpis["municipios"]
+
+        kpis_data = [
+            {
+                "titulo": "Cobertura CPN Promedio",
+                "valor": f"{cobertura_cpn:.1f}%" if not pd.isna(cobertura_cpn) else "N/A",
+                "color": "primary",
+                "icono": "fas fa-user-md"
+            },
+            {
+                "titulo": "Parto Institucional",
+                "valor": f"{parto_inst:.1f}%" if not pd.isna(parto_inst) else "N/A",
+                "color": "success",
+                "icono": "fas fa-hospital"
+            },
+            {
+                "titulo": "Casos Violencia Sexual",
+                "valor": str(casos_vs),
+                "color": "warning",
+                "icono": "fas fa-shield-alt"
+            },
+            {
+                "titulo": "Municipios Monitoreados",
+                "valor": str(municipios),
+                "color": "info",
+                "icono": "fas fa-map-marked-alt"
+            }
+        ]
+    else:
+        # Sin valores calculados no se muestran cifras: las tarjetas quedan en N/A
+        kpis_data = [
+            {"titulo": "Cobertura CPN Promedio", "valor": "N/A", "color": "primary", "icono": "fas fa-user-md"},
+            {"titulo": "Parto Institucional", "valor": "N/A", "color": "success", "icono": "fas fa-hospital"},
+            {"titulo": "Casos Violencia Sexual", "valor": "N/A", "color": "warning", "icono": "fas fa-shield-alt"},
+            {"titulo": "Municipios Monitoreados", "valor": "N/A", "color": "info", "icono": "fas fa-map-marked-alt"}
+        ]
+
+    return dbc.Row([
+        dbc.Col([
+            dbc.Card([
+                dbc.CardBody([
+                    html.Div([
+                        html.I(className=f"{kpi['icono']} fa-2x mb-2",
+                              style={"color": f"var(--bs-{kpi['color']})"})
+                    ], className="text-center"),
+                    html.H3(kpi["valor"], className="text-center mb-1"),
+                    html.P(kpi["titulo"], className="text-center text-muted mb-0")
+                ])
+            ], color=kpi["color"], outline=True, className="h-100")
+        ], width=3) for kpi in kpis_data
+    ])
+
+
+def render(datos):
+    # El contenido llega con cargar_kpis
+    return plegable(
+        SECCION,
+        ("fas fa-chart-line", "Indicadores Clave", "primary"),
+        ("fas fa-tachometer-alt", "Indicadores Clave", "bg-primary text-white"),
+        dbc.CardBody(id="kpis-content"),
+        abierto=False
     )
-    def actualizar_kpis(_):
-        cards = []
-        for _, row in df.iterrows():
-            color = ("success" if row["Valor (%)"] >= row["Meta (%)"]
-                     else "warning" if row["Valor (%)"] >= 60
-                     else "danger")
-            cards.append(
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5(row["Indicador"], className="card-title"),
-                        html.H2(f"{row['Valor (%)']:.1f}%", className=f"text-{color}"),
-                        html.P(f"Meta: {row['Meta (%)']}%"),
-                        html.P(f"Categoría: {row['Categoría']}")
-                    ])
-                ], className="m-2", style={"width": "200px"})
-            )
-        return dbc.Row(cards, justify="start")
+
+
+def registrar(contexto):
+    # Con render diferido, la primera vez que se abre el panel
+    @contexto.callback(
+        Output("kpis-content", "children"),
+        Input("collapse-kpi", "is_open"),
+        State("kpis-content", "children")
+    )
+    def cargar_kpis(abierto, contenido):
+        if contenido or (config.RENDER_DIFERIDO and not abierto):
+            return no_update
+        return crear_kpis(contexto.datos().kpis)
+
+    contexto.alternar(SECCION)
@@ -1,34 +1,31 @@
-from dash import dcc, html
-import plotly.express as px
-import json
+# components/mapa_violencia.py
+"""Mapa del promedio de violencia sexual por municipio (no habilitado por defecto).
 
-def render(df):
-    # Filtrar solo violencia sexual
-    df_vs = df[df["Categoría"] == "Violencia Sexual"]
+No tiene callbacks: el mapa se arma con la sección, que ya queda en la caché
+de figuras (contenido_seccion) o en el layout serializado de la versión.
+"""
+from dash import dcc
+import dash_bootstrap_components as dbc
+
+import graficos
+from components.contexto import tarjeta
 
-    # Cargar el GeoJSON con límites municipales del Cauca
-    with open("data/cauca_municipios.geojson", encoding="utf-8") as f:
-        geojson = json.load(f)
+SECCION = "mapa_violencia"
+DIFERIBLE = True
+DATOS = ("indicadores",)
+CACHE = {}
 
-    # Crear el mapa
-    fig = px.choropleth_mapbox(
-        df_vs,
-        geojson=geojson,
-        locations="Municipio",
-        featureidkey="properties.NOMBRE_MUN",  # Asegúrate que esta clave coincide con el nombre del municipio en el GeoJSON
-        color="Valor (%)",
-        color_continuous_scale="Reds",
-        mapbox_style="carto-positron",
-        zoom=6,
-        center={"lat": 2.5, "lon": -76.6},
-        opacity=0.6,
-        hover_name="Municipio",
-        hover_data={"Valor (%)": True, "Indicador": True}
-    )
 
-    fig.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
+def render(datos):
+    df = datos.indicadores
+    df_vs = df[df["Categoría"] == "Violencia Sexual"]
+    if df_vs.empty:
+        cuerpo = dbc.Alert("No hay datos de violencia sexual disponibles", color="warning")
+    else:
+        promedios = df_vs.groupby("Municipio", observed=True, as_index=False)["Valor (%)"].mean()
+        cuerpo = dcc.Graph(figure=graficos.figura_mapa_violencia(datos.con_nombres(promedios)))
+    return tarjeta("fas fa-map-marked-alt", "Mapa de Violencia Sexual por Municipio", "bg-danger text-white", cuerpo)
+
 
-    return html.Div([
-        html.H2("🗺️ Mapa de violencia sexual por municipio", style={"marginTop": "40px"}),
-        dcc.Graph(figure=fig)
-    ])
+def registrar(contexto):
+    pass
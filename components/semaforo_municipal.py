@@ -1,40 +1,98 @@
-from dash import dcc, html
+# components/semaforo_municipal.py
+"""Semáforo de cumplimiento de metas por municipio (estado precalculado al cargar)."""
+from dash import html, dcc, dash_table
 from dash.dependencies import Input, Output
-import dash_table
 import dash_bootstrap_components as dbc
 
-def render(df):
-    municipios = sorted(df["Municipio"].unique())
+from components.contexto import enlaces_exportacion, tarjeta
+from datos import esquema
+from instrumentacion import metricas
+
+SECCION = "semaforo"
+DIFERIBLE = True
+DATOS = ("indicadores",)
+CACHE = {}
+
+
+def crear_semaforo_municipal(datos):
+    """Crear componente de semáforo municipal"""
+    municipios = esquema.valores(datos.indicadores['Municipio'])
+
     return html.Div([
-        html.H2("Semáforo por Municipio", className="mb-3"),
-        dcc.Dropdown(
-            id="sm-municipio-dropdown",
-            options=[{"label": m, "value": m} for m in municipios],
-            value=municipios[0],
-            clearable=False,
-            className="mb-3"
-        ),
-        html.Div(id="sm-table")
-    ], className="mb-5")
-
-def register_callbacks(app, df):
-    @app.callback(
-        Output("sm-table", "children"),
-        Input("sm-municipio-dropdown", "value")
+        dbc.Row([
+            dbc.Col([
+                html.Label("Seleccionar Municipio:", className="fw-bold"),
+                dcc.Dropdown(
+                    id="semaforo-municipio-dropdown",
+                    options=datos.opciones_municipio(municipios),
+                    value=municipios[0] if municipios else None
+                )
+            ], width=6)
+        ], className="mb-3"),
+
+        html.Div(id="tabla-semaforo")
+    ])
+
+
+def render(datos):
+    return tarjeta("fas fa-traffic-light", "Semáforo de Cumplimiento Municipal", "bg-success text-white",
+                   crear_semaforo_municipal(datos))
+
+
+def filas_tabla(datos, municipio):
+    # Estado precalculado al cargar los datos (misma posición de filas)
+    return datos.semaforo.iloc[datos.por_municipio.posiciones(municipio)]
+
+
+def registrar(contexto):
+    contexto.tabla("semaforo", "semaforo-tabla", "semaforo-municipio-dropdown", filas_tabla)
+
+    @contexto.callback(
+        Output("tabla-semaforo", "children"),
+        Input("semaforo-municipio-dropdown", "value")
     )
-    def actualizar_semaforo(mun):
-        dff = df[df["Municipio"] == mun].copy()
-        # ejemplo: añadir columna color según Valor vs Meta
-        dff["Semáforo"] = dff.apply(
-            lambda r: ("🟢" if r["Valor (%)"] >= r["Meta (%)"] 
-                       else "🟠" if r["Valor (%)"] >= 60 
-                       else "🔴"),
-            axis=1
-        )
-        return dash_table.DataTable(
-            columns=[{"name": c, "id": c} for c in dff.columns],
-            data=dff.to_dict("records"),
-            style_cell={'textAlign': 'center'},
-            style_header={'fontWeight': 'bold'}
-        )
+    def mostrar_tabla_semaforo(municipio):
+        datos = contexto.datos()
+        if not municipio:
+            return dbc.Alert("Selecciona un municipio", color="info")
+
+        with metricas.fase("filtro"):
+            df_m = filas_tabla(datos, municipio)
+
+        if df_m.empty:
+            return dbc.Alert(f"No hay datos para {datos.nombre_municipio(municipio)}", color="warning")
 
+        return html.Div([enlaces_exportacion("semaforo-tabla", "semaforo", municipio=municipio),
+                         dash_table.DataTable(
+            id="semaforo-tabla",
+            columns=[
+                {"name": "Indicador", "id": "Indicador"},
+                {"name": "Valor (%)", "id": "Valor (%)", "type": "numeric", "format": {"specifier": ".1f"}},
+                {"name": "Meta (%)", "id": "Meta (%)", "type": "numeric", "format": {"specifier": ".1f"}},
+                {"name": "Estado", "id": "Estado"}
+            ],
+            **contexto.primera_pagina("semaforo", municipio),
+            style_cell={"textAlign": "center", "padding": "12px"},
+            style_header={
+                "backgroundColor": "#28a745",
+                "color": "white",
+                "fontWeight": "bold"
+            },
+            style_data_conditional=[
+                {
+                    'if': {'filter_query': '{Estado} contains "🟢"'},
+                    'backgroundColor': '#d4edda',
+                    'color': 'black'
+                },
+                {
+                    'if': {'filter_query': '{Estado} contains "🟡"'},
+                    'backgroundColor': '#fff3cd',
+                    'color': 'black'
+                },
+                {
+                    'if': {'filter_query': '{Estado} contains "🔴"'},
+                    'backgroundColor': '#f8d7da',
+                    'color': 'black'
+                }
+            ]
+        )])
@@ -1,78 +1,126 @@
-# sifilis.py
+# components/sifilis.py
+"""Sífilis gestacional y congénita: casos por semana epidemiológica.
 
-import pandas as pd
-import plotly.express as px
+La serie sale del cubo preagregado de la instantánea (datos/sifilis.py);
+con TABLERO_SIFILIS_CLIENTE=1 el cubo viaja una vez con la sección y el
+filtro corre en el navegador (assets/sifilis_cliente.js).
+"""
+import functools
+import json
+
+from dash import dcc
+from dash.dependencies import ClientsideFunction, Input, Output, State
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Input, Output
-
-# Carga de datos
-df_sifilis = pd.read_excel("assets/data/its_sifilis.xlsx")
-df_sifilis["fecha_notif"] = pd.to_datetime(df_sifilis["fecha_notif"], errors="coerce")
-df_sifilis["casos"] = pd.to_numeric(df_sifilis["casos"], errors="coerce")
-df_sifilis["semana"] = pd.to_numeric(df_sifilis["semana"], errors="coerce")
-
-# Layout del módulo
-layout = html.Div([
-    html.H3("Indicadores de Sífilis", className="module-title"),
-
-    dbc.Tabs([
-        dbc.Tab(label="Sífilis Gestacional", tab_id="gestacional"),
-        dbc.Tab(label="Sífilis Congénita", tab_id="congenita"),
-    ], id="sifilis-tabs", active_tab="gestacional"),
-
-    html.Div(id="sifilis-content")
-])
-
-# Callback para renderizar contenido según pestaña
-def register_callbacks(app):
-    @app.callback(
-        Output("sifilis-content", "children"),
-        Input("sifilis-tabs", "active_tab")
-    )
-    def render_tab(tab):
-        df = df_sifilis[df_sifilis["evento"] == ("Sífilis Gestacional" if tab == "gestacional" else "Sífilis Congénita")]
-
-        municipios = sorted(df["municipio"].dropna().unique())
-        eps_list = sorted(df["eps"].dropna().unique())
-
-        return html.Div([
-            dbc.Row([
-                dbc.Col(dcc.Dropdown(
-                    options=[{"label": m, "value": m} for m in municipios],
-                    id="filtro-municipio",
-                    placeholder="Filtrar por municipio"
-                ), md=6),
-                dbc.Col(dcc.Dropdown(
-                    options=[{"label": e, "value": e} for e in eps_list],
-                    id="filtro-eps",
-                    placeholder="Filtrar por EPS"
-                ), md=6),
-            ]),
-            dcc.Graph(id="grafico-sifilis")
-        ])
-
-    @app.callback(
-        Output("grafico-sifilis", "figure"),
-        Input("sifilis-tabs", "active_tab"),
-        Input("filtro-municipio", "value"),
-        Input("filtro-eps", "value")
-    )
-    def update_graph(tab, municipio, eps):
-        df = df_sifilis[df_sifilis["evento"] == ("Sífilis Gestacional" if tab == "gestacional" else "Sífilis Congénita")]
-
-        if municipio:
-            df = df[df["municipio"] == municipio]
-        if eps:
-            df = df[df["eps"] == eps]
-
-        df_grouped = df.groupby("semana")["casos"].sum().reset_index()
-
-        fig = px.bar(
-            df_grouped,
-            x="semana", y="casos",
-            title="Casos por semana epidemiológica",
-            labels={"semana": "Semana", "casos": "Número de casos"},
-            color_discrete_sequence=["#0072B5"]
-        )
-        fig.update_layout(margin=dict(t=40, l=20, r=20, b=20))
+from plotly.io.json import to_json_plotly
+
+from arranque import perezoso
+import config
+import graficos
+from components.contexto import enlaces_exportacion, tarjeta
+from datos import esquema
+from instrumentacion import metricas
+
+pd = perezoso("pandas")
+
+SECCION = "sifilis"
+DIFERIBLE = True
+DATOS = ("sifilis",)
+CACHE = {"update_sifilis_graph": "figuras"}
+
+
+@functools.lru_cache(maxsize=1)
+def plantilla_grafico_sifilis():
+    """Traza y layout de graficos.figura_sifilis (sin datos) para armar la figura en el navegador."""
+    vacia = pd.DataFrame({"semana": pd.Series(dtype="int64"), "casos": pd.Series(dtype="float64")})
+    fig = json.loads(to_json_plotly(graficos.figura_sifilis(vacia, "")))
+    traza = {k: v for k, v in fig["data"][0].items() if k not in ("x", "y")}
+    return {"traza": traza, "layout": fig["layout"]}
+
+
+def render(datos):
+    df_sifilis = datos.sifilis
+    return tarjeta("fas fa-vial", "Indicadores de Sífilis", "bg-secondary text-white", [
+        dbc.Tabs([
+            dbc.Tab(label="Sífilis Gestacional", tab_id="gestacional"),
+            dbc.Tab(label="Sífilis Congénita", tab_id="congenita"),
+        ], id="sifilis-tabs", active_tab="gestacional", className="mb-3"),
+
+        dbc.Row([
+            dbc.Col(dcc.Dropdown(
+                options=datos.opciones_municipio(esquema.valores(df_sifilis["municipio"])),
+                id="filtro-municipio",
+                placeholder="Filtrar por municipio"
+            ), md=6),
+            dbc.Col(dcc.Dropdown(
+                options=[{"label": e, "value": e} for e in esquema.valores(df_sifilis["eps"])],
+                id="filtro-eps",
+                placeholder="Filtrar por EPS"
+            ), md=6),
+        ], className="mb-3"),
+
+        dcc.Graph(id="grafico-sifilis"),
+        enlaces_exportacion("sifilis", "sifilis", tab="gestacional"),
+        *([dcc.Store(id="sifilis-cubo", data=dict(datos.cubo_sifilis.compacto(), **plantilla_grafico_sifilis()))]
+          if config.SIFILIS_CLIENTE else [])
+    ])
+
+
+def filas_exportacion(datos, parametros):
+    df = datos.sifilis
+    evento = "Sífilis Congénita" if parametros.get("tab") == "congenita" else "Sífilis Gestacional"
+    mascara = df["evento"] == evento
+    if parametros.get("municipio"):
+        mascara &= df["municipio"] == parametros["municipio"]
+    if parametros.get("eps"):
+        mascara &= df["eps"] == parametros["eps"]
+    return datos.con_nombres(df[mascara])
+
+
+def vistas_por_defecto(datos):
+    return [("update_sifilis_graph", ["gestacional", None, None])]
+
+
+def registrar(contexto):
+    contexto.exportacion("sifilis", filas_exportacion)
+
+    def update_sifilis_graph(tab, municipio, eps):
+        evento = "Sífilis Gestacional" if tab == "gestacional" else "Sífilis Congénita"
+        # Lectura directa del cubo preagregado (evento, municipio, eps) -> casos por semana
+        with metricas.fase("filtro"):
+            df_grouped = contexto.datos().cubo_sifilis.serie(evento, municipio, eps).reset_index()
+
+        with metricas.fase("figura"):
+            fig = contexto.pool_figuras.ejecutar(graficos.figura_sifilis, df_grouped, evento)
         return fig
+
+    # Memorizada también con el filtro en el navegador: la usa el precalentamiento
+    update_sifilis_graph = contexto.cacheado(update_sifilis_graph)
+
+    if config.SIFILIS_CLIENTE:
+        contexto.app.clientside_callback(
+            ClientsideFunction(namespace="sifilis", function_name="grafico"),
+            Output("grafico-sifilis", "figure"),
+            Input("sifilis-tabs", "active_tab"),
+            Input("filtro-municipio", "value"),
+            Input("filtro-eps", "value"),
+            State("sifilis-cubo", "data")
+        )
+    else:
+        contexto.app.callback(
+            Output("grafico-sifilis", "figure"),
+            Input("sifilis-tabs", "active_tab"),
+            Input("filtro-municipio", "value"),
+            Input("filtro-eps", "value")
+        )(update_sifilis_graph)
+
+    # Enlaces de descarga: siguen la pestaña y los filtros (assets/exportar.js)
+    contexto.app.clientside_callback(
+        ClientsideFunction(namespace="exportar", function_name="sifilis"),
+        [Output("sifilis-csv", "href"),
+         Output("sifilis-xlsx", "href")],
+        [Input("sifilis-tabs", "active_tab"),
+         Input("filtro-municipio", "value"),
+         Input("filtro-eps", "value")],
+        [State("sifilis-csv", "href"),
+         State("sifilis-xlsx", "href")]
+    )
@@ -1,72 +1,124 @@
-from dash import dcc, html
+# components/violencia.py
+"""Violencia sexual por municipio: gráfico, tabla y tendencia."""
+from dash import html, dcc, dash_table
 from dash.dependencies import Input, Output
-import plotly.express as px
 import dash_bootstrap_components as dbc
 
-def render(df):
-    if df.empty:
-        return dbc.Alert("No hay datos disponibles", color="warning")
+import graficos
+from components.contexto import enlaces_exportacion, tarjeta
+from datos import esquema
+from instrumentacion import metricas
 
-    df_vs = df[df["Categoría"] == "Violencia Sexual"]
-    municipios = sorted(df_vs["Municipio"].unique())
+SECCION = "violencia"
+DIFERIBLE = True
+DATOS = ("indicadores",)
+CACHE = {"actualizar_violencia_sexual": "figuras"}
+
+
+def municipios_violencia(df):
+    return esquema.valores(df[df['Categoría'] == 'Violencia Sexual']['Municipio'])
+
+
+def crear_violencia_sexual(datos):
+    """Crear componente de violencia sexual mejorado"""
+    municipios_vs = municipios_violencia(datos.indicadores)
 
-    # layout
     return html.Div([
         dbc.Row([
             dbc.Col([
-                html.Label("Municipio:", className="fw-bold"),
+                html.Label("Seleccionar Municipio:", className="fw-bold"),
                 dcc.Dropdown(
                     id="vs-municipio-dropdown",
-                    options=[{"label": m, "value": m} for m in municipios],
-                    value=municipios[0],
-                    clearable=False,
-                    className="mb-3"
+                    options=datos.opciones_municipio(municipios_vs) if municipios_vs else [{"label": "Sin datos", "value": ""}],
+                    value=municipios_vs[0] if municipios_vs else ""
                 )
             ], width=6),
             dbc.Col([
-                html.Label("Tipo de gráfico:", className="fw-bold"),
+                html.Label("Vista:", className="fw-bold"),
                 dcc.Dropdown(
-                    id="vs-tipo-grafico-dropdown",
+                    id="vs-vista-dropdown",
                     options=[
-                        {"label": "Barras", "value": "Barras"},
-                        {"label": "Línea",  "value": "Línea"},
-                        {"label": "Pastel", "value": "Pastel"},
-                        {"label": "Tabla",  "value": "Tabla"}
+                        {"label": "📊 Gráfico", "value": "grafico"},
+                        {"label": "📋 Tabla", "value": "tabla"},
+                        {"label": "📈 Tendencia", "value": "tendencia"}
                     ],
-                    value="Barras",
-                    clearable=False,
-                    className="mb-3"
+                    value="grafico"
                 )
-            ], width=6),
-        ], className="mb-4"),
+            ], width=6)
+        ], className="mb-3"),
+
+        html.Div(id="contenido-violencia-sexual")
+    ])
+
+
+def render(datos):
+    return tarjeta("fas fa-shield-alt", "Violencia Sexual - Análisis Detallado", "bg-danger text-white",
+                   crear_violencia_sexual(datos))
+
 
-        html.Div(id="vs-contenido")
-    ], className="mb-5")
+def filas_tabla(datos, municipio):
+    return datos.por_categoria_municipio.filas("Violencia Sexual", municipio)[["Indicador", "Valor (%)", "Meta (%)"]]
 
 
-def register_callbacks(app, df):
-    @app.callback(
-        Output("vs-contenido", "children"),
-        Input("vs-municipio-dropdown", "value"),
-        Input("vs-tipo-grafico-dropdown", "value")
+def vistas_por_defecto(datos):
+    municipios_vs = municipios_violencia(datos.indicadores)
+    return [("actualizar_violencia_sexual", [municipios_vs[0], "grafico"])] if municipios_vs else []
+
+
+def registrar(contexto):
+    contexto.tabla("violencia", "vs-tabla", "vs-municipio-dropdown", filas_tabla)
+
+    @contexto.callback(
+        Output("contenido-violencia-sexual", "children"),
+        [Input("vs-municipio-dropdown", "value"),
+         Input("vs-vista-dropdown", "value")]
     )
-    def actualizar_vs(municipio, tipo):
-        df_vs = df[df["Categoría"] == "Violencia Sexual"]
-        df_sel = df_vs[df_vs["Municipio"] == municipio]
-
-        if tipo == "Tabla":
-            return dbc.Table.from_dataframe(
-                df_sel.drop(columns=["Categoría"]), striped=True, bordered=True, hover=True
-            )
-
-        if tipo == "Pastel":
-            fig = px.pie(df_sel, names="Indicador", values="Valor (%)",
-                         title=f"Violencia Sexual en {municipio}")
-        elif tipo == "Línea":
-            fig = px.line(df_sel, x="Año", y="Valor (%)",
-                          title=f"Tendencia de VS en {municipio}")
-        else:
-            fig = px.bar(df_sel, x="Indicador", y="Valor (%)",
-                         title=f"Violencia Sexual en {municipio}")
-
-        return dcc.Graph(figure=fig)
+    def actualizar_violencia_sexual(municipio, vista):
+        datos = contexto.datos()
+        if not municipio:
+            return dbc.Alert("No hay datos de violencia sexual disponibles", color="warning")
+
+        with metricas.fase("filtro"):
+            df_vs = datos.por_categoria_municipio.filas("Violencia Sexual", municipio)
+
+        if df_vs.empty:
+            return dbc.Alert(f"No hay datos de violencia sexual para {datos.nombre_municipio(municipio)}", color="info")
+
+        if vista == "grafico":
+            with metricas.fase("figura"):
+                fig = contexto.pool_figuras.ejecutar(graficos.figura_violencia, df_vs[["Indicador", "Valor (%)"]],
+                                                     datos.nombre_municipio(municipio))
+            return dcc.Graph(figure=fig)
+
+        elif vista == "tabla":
+            return html.Div([enlaces_exportacion("vs-tabla", "violencia", municipio=municipio),
+                             dash_table.DataTable(
+                id="vs-tabla",
+                **contexto.primera_pagina("violencia", municipio),
+                columns=[
+                    {"name": "Indicador", "id": "Indicador"},
+                    {"name": "Valor (%)", "id": "Valor (%)", "type": "numeric", "format": {"specifier": ".1f"}},
+                    {"name": "Meta (%)", "id": "Meta (%)", "type": "numeric", "format": {"specifier": ".1f"}}
+                ],
+                style_cell={'textAlign': 'center', 'padding': '12px'},
+                style_header={
+                    'backgroundColor': '#dc3545',
+                    'color': 'white',
+                    'fontWeight': 'bold'
+                },
+                style_data_conditional=[
+                    {
+                        'if': {'row_index': 'odd'},
+                        'backgroundColor': '#f8f9fa'
+                    }
+                ]
+            )])
+
+        elif vista == "tendencia":
+            with metricas.fase("figura"):
+                fig = contexto.pool_figuras.ejecutar(graficos.figura_tendencia_violencia,
+                                                     df_vs[["Año", "Indicador", "Valor (%)"]],
+                                                     datos.nombre_municipio(municipio))
+            return dcc.Graph(figure=fig)
+
+        return dbc.Alert("Selecciona una vista", color="info")
@@ -0,0 +1,62 @@
+# config.py
+"""Rutas y parámetros del tablero (se pueden ajustar con variables de entorno)."""
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("TABLERO_DATA_DIR", os.path.join(BASE_DIR, "data"))
+
+# Directorio donde se guardan las versiones columnares de los Excel
+CACHE_DIR = os.environ.get("TABLERO_CACHE_DIR", os.path.join(DATA_DIR, ".cache"))
+
+# Mapear las columnas numéricas de la caché en memoria (compartidas entre workers)
+MMAP = os.environ.get("TABLERO_MMAP", "1") == "1"
+
+# Cada cuántos segundos se revisa si cambiaron los Excel (0 desactiva la recarga)
+INTERVALO_VIGILANCIA = float(os.environ.get("TABLERO_VIGILANCIA_SEG", "30"))
+
+# Caché de figuras de los callbacks: "memoria" (por worker), "disco" (compartida) u "off"
+CACHE_FIGURAS = os.environ.get("TABLERO_CACHE_FIGURAS", "memoria")
+CACHE_FIGURAS_MAX = int(os.environ.get("TABLERO_CACHE_FIGURAS_MAX", "256"))
+CACHE_FIGURAS_TTL = float(os.environ.get("TABLERO_CACHE_FIGURAS_TTL", "600"))
+
+# Tolerancia de simplificación de los polígonos municipales (en grados)
+TOLERANCIA_GEOMETRIA = float(os.environ.get("TABLERO_TOLERANCIA_GEOMETRIA", "0.005"))
+
+# Métricas por callback en /metrics y cabecera Server-Timing opcional
+METRICAS = os.environ.get("TABLERO_METRICAS", "1") == "1"
+SERVER_TIMING = os.environ.get("TABLERO_SERVER_TIMING", "0") == "1"
+
+# Render diferido: las secciones plegadas o debajo del pliegue se arman al
+# abrirlas o al acercarse a la vista (cada cuántos ms lo revisa el navegador)
+RENDER_DIFERIDO = os.environ.get("TABLERO_RENDER_DIFERIDO", "1") == "1"
+VIGIA_SECCIONES_MS = int(os.environ.get("TABLERO_VIGIA_SECCIONES_MS", "300"))
+
+# Filtrar la serie de sífilis en el navegador: el cubo viaja una vez con la sección
+SIFILIS_CLIENTE = os.environ.get("TABLERO_SIFILIS_CLIENTE", "0") == "1"
+
+# Pool de procesos para construir figuras (0 = en el mismo proceso). Cupos
+# por worker, segundos máximos por figura y espera máxima por un cupo libre
+FIGURAS_PROCESOS = int(os.environ.get("TABLERO_FIGURAS_PROCESOS", "0"))
+FIGURAS_PENDIENTES = int(os.environ.get("TABLERO_FIGURAS_PENDIENTES", "0")) or None
+FIGURAS_TIMEOUT = float(os.environ.get("TABLERO_FIGURAS_TIMEOUT", "10"))
+FIGURAS_ESPERA = float(os.environ.get("TABLERO_FIGURAS_ESPERA", "0.5"))
+
+# Precalentar la caché de figuras tras cada carga de datos: vistas por
+# defecto más las TABLERO_PRECALENTAR_TOP combinaciones más pedidas
+PRECALENTAR = os.environ.get("TABLERO_PRECALENTAR", "1") == "1"
+PRECALENTAR_TOP = int(os.environ.get("TABLERO_PRECALENTAR_TOP", "20"))
+
+# Componentes (secciones) habilitados, en cualquier orden; solo se importan y
+# se cargan las fuentes de estos. Ver components/__init__.py
+COMPONENTES = [c.strip() for c in os.environ.get(
+    "TABLERO_COMPONENTES",
+    "kpis,control_prenatal,grafico_categoria,semaforo_municipal,violencia,gestantes,sifilis"
+).split(",") if c.strip()]
+
+# Carga diferida: el worker atiende apenas termina de importar app.py y la
+# primera carga de datos corre en un hilo (los callbacks la esperan). Con
+# preload_app de gunicorn se desactiva: los hilos no sobreviven al fork
+CARGA_DIFERIDA = os.environ.get("TABLERO_CARGA_DIFERIDA", "1") == "1"
+
+# Imprimir el perfil de arranque con el tiempo de import de cada paquete (arranque.py)
+PERFIL_ARRANQUE = os.environ.get("TABLERO_PERFIL_ARRANQUE", "0") == "1"
@@ -0,0 +1,141 @@
+# datos/cache_columnar.py
+"""Caché columnar en disco (.npy por columna) para los libros de Excel.
+
+Cada libro se convierte una sola vez: el resultado queda en
+CACHE_DIR/<nombre>-<sha1>-<coerciones>/ con un archivo .npy por columna y un meta.json
+con el esquema. Las columnas de texto se guardan como códigos enteros más
+su diccionario de categorías (ordenado) y se leen como Categorical.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from arranque import perezoso
+import config
+
+np = perezoso("numpy")
+pd = perezoso("pandas")
+
+# Subir este número invalida todas las cachés escritas con el formato anterior
+VERSION_FORMATO = 2
+
+
+def huella_archivo(ruta):
+    """SHA-1 del contenido del archivo, leído por bloques."""
+    sha1 = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(bloque)
+    return sha1.hexdigest()
+
+
+def _leer_json(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def escribir_json(ruta, datos):
+    """Escribe un JSON de forma atómica (archivo temporal + rename)."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, ruta)
+
+
+def clave_cache(ruta, extra=""):
+    """Clave de caché del archivo: mtime+tamaño resuelven el sha1 sin releerlo."""
+    st = os.stat(ruta)
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    ruta_indice = os.path.join(config.CACHE_DIR, f"{nombre}.json")
+    indice = _leer_json(ruta_indice) or {}
+
+    if indice.get("mtime_ns") == st.st_mtime_ns and indice.get("tamano") == st.st_size:
+        sha1 = indice["sha1"]
+    else:
+        sha1 = huella_archivo(ruta)
+        os.makedirs(config.CACHE_DIR, exist_ok=True)
+        escribir_json(ruta_indice, {"mtime_ns": st.st_mtime_ns, "tamano": st.st_size, "sha1": sha1})
+
+    # Las coerciones y el formato también forman parte de la clave
+    sufijo = hashlib.sha1(f"{VERSION_FORMATO}|{extra}".encode("utf-8")).hexdigest()[:8]
+    return f"{nombre}-{sha1[:16]}-{sufijo}"
+
+
+def guardar(df, directorio):
+    """Guarda un DataFrame como un .npy por columna más meta.json."""
+    os.makedirs(os.path.dirname(directorio), exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(directorio), prefix=".tmp-")
+    columnas = []
+    try:
+        for i, col in enumerate(df.columns):
+            serie = df[col]
+            archivo = f"c{i:03d}.npy"
+            if pd.api.types.is_datetime64_any_dtype(serie) or pd.api.types.is_bool_dtype(serie) \
+                    or pd.api.types.is_numeric_dtype(serie):
+                tipo = "fecha" if pd.api.types.is_datetime64_any_dtype(serie) else "numero"
+                np.save(os.path.join(tmp, archivo), serie.to_numpy())
+                columnas.append({"nombre": str(col), "tipo": tipo, "archivo": archivo})
+            else:
+                codigos, categorias = pd.factorize(serie.astype(object).where(serie.notna(), None), sort=True)
+                np.save(os.path.join(tmp, archivo), codigos.astype(np.int32))
+                columnas.append({
+                    "nombre": str(col),
+                    "tipo": "texto",
+                    "archivo": archivo,
+                    "categorias": [str(c) for c in categorias],
+                })
+
+        escribir_json(os.path.join(tmp, "meta.json"), {
+            "formato": VERSION_FORMATO,
+            "filas": len(df),
+            "columnas": columnas,
+        })
+        try:
+            os.rename(tmp, directorio)
+        except OSError:
+            # Otro worker terminó la conversión primero; su copia es equivalente
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def cargar(directorio, mmap=False):
+    """Lee un DataFrame guardado con guardar(); None si no existe.
+
+    Con mmap=True las columnas numéricas quedan mapeadas en memoria de solo
+    lectura: los workers que abren el mismo archivo comparten sus páginas.
+    """
+    meta = _leer_json(os.path.join(directorio, "meta.json"))
+    if meta is None or meta.get("formato") != VERSION_FORMATO:
+        return None
+
+    datos = {}
+    for col in meta["columnas"]:
+        arr = np.load(os.path.join(directorio, col["archivo"]),
+                      mmap_mode="r" if mmap else None, allow_pickle=False)
+        if col["tipo"] == "texto":
+            try:
+                # Los códigos ya son los de la categórica: no se arma ningún arreglo de textos
+                arr = pd.Categorical.from_codes(arr, categories=col["categorias"])
+            except ValueError:
+                # Categorías repetidas al pasarlas a texto (p. ej. 1 y "1")
+                categorias = np.array(col["categorias"] + [np.nan], dtype=object)
+                arr = categorias[arr]  # el código -1 apunta al NaN final
+        datos[col["nombre"]] = arr
+    # copy=False conserva los arreglos (y su mapeo) tal como se leyeron
+    return pd.DataFrame(datos, copy=False)
+
+
+def limpiar_antiguas(clave):
+    """Elimina las conversiones anteriores del mismo archivo."""
+    nombre = clave.rsplit("-", 2)[0]
+    for entrada in os.listdir(config.CACHE_DIR):
+        ruta = os.path.join(config.CACHE_DIR, entrada)
+        if entrada != clave and entrada.rsplit("-", 2)[0] == nombre and os.path.isdir(ruta):
+            shutil.rmtree(ruta, ignore_errors=True)
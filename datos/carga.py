@@ -0,0 +1,93 @@
+# datos/carga.py
+"""Carga de las fuentes del tablero a través de la caché columnar."""
+import os
+
+from arranque import perezoso
+import config
+from datos import cache_columnar, esquema
+from datos.ingesta import AlmacenIncremental
+
+pd = perezoso("pandas")
+
+# nombre lógico -> archivo en data/ (columnas y tipos: datos/esquema.CONTRATOS)
+FUENTES = {
+    "indicadores": "indicadores.xlsx",
+    "cpn": "cpn_gestantes_resumen.xlsx",
+    "gestantes": "GESTANTES_MUNICIPIO.xlsx",
+    "sifilis": "its_sifilis.xlsx",
+}
+
+# Fuentes que solo crecen: se ingieren por incrementos según esta columna de fecha
+INCREMENTALES = {"sifilis": "fecha_notif"}
+_almacenes = {}
+
+# Filas enviadas a cuarentena en este proceso, por fuente (para /metrics)
+cuarentena = {}
+
+
+def ruta_fuente(nombre):
+    return os.path.join(config.DATA_DIR, FUENTES[nombre])
+
+
+def guardar_cuarentena(nombre, descartadas):
+    """Agrega las filas descartadas a CACHE_DIR/cuarentena/<fuente>.csv."""
+    cuarentena[nombre] = cuarentena.get(nombre, 0) + len(descartadas)
+    print(f"{nombre}: {len(descartadas)} filas en cuarentena "
+          f"({descartadas['motivo'].value_counts().to_dict()})")
+    ruta = os.path.join(config.CACHE_DIR, "cuarentena", f"{nombre}.csv")
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        nuevo = not os.path.exists(ruta)
+        descartadas.assign(ingesta=pd.Timestamp.now().isoformat(timespec="seconds")).to_csv(
+            ruta, mode="a", header=nuevo, index=False
+        )
+    except OSError as e:
+        print(f"No se pudo guardar la cuarentena de {nombre}: {e}")
+
+
+def convertir(nombre, df):
+    """Valida las filas contra el contrato de la fuente; las que no lo cumplen van a cuarentena."""
+    validas, descartadas = esquema.validar(nombre, df)
+    if len(descartadas):
+        guardar_cuarentena(nombre, descartadas)
+    return validas
+
+
+def leer_excel(nombre):
+    """Lee el Excel original y aplica sus coerciones (camino lento)."""
+    return convertir(nombre, pd.read_excel(ruta_fuente(nombre)))
+
+
+def almacen(nombre):
+    """Almacén incremental de la fuente (uno por proceso)."""
+    if nombre not in _almacenes:
+        _almacenes[nombre] = AlmacenIncremental(
+            nombre, ruta_fuente(nombre), INCREMENTALES[nombre], lambda df: convertir(nombre, df),
+            version=esquema.version(nombre),
+        )
+    return _almacenes[nombre]
+
+
+def cargar_fuente(nombre):
+    """Devuelve la fuente desde la caché; convierte el Excel solo si cambió."""
+    ruta = ruta_fuente(nombre)
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(ruta)
+
+    try:
+        if nombre in INCREMENTALES:
+            return almacen(nombre).cargar()
+        # Un cambio en el esquema invalida la conversión guardada
+        clave = cache_columnar.clave_cache(ruta, extra=esquema.version(nombre))
+        directorio = os.path.join(config.CACHE_DIR, clave)
+        df = cache_columnar.cargar(directorio, mmap=config.MMAP)
+        if df is not None:
+            return df
+        cache_columnar.guardar(leer_excel(nombre), directorio)
+        cache_columnar.limpiar_antiguas(clave)
+        # Se relee desde la caché para que también la primera carga quede mapeada
+        return cache_columnar.cargar(directorio, mmap=config.MMAP)
+    except OSError as e:
+        # Sin permisos de escritura para la caché: se sigue con el Excel
+        print(f"Caché no disponible para {nombre}: {e}")
+        return leer_excel(nombre)
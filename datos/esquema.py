@@ -0,0 +1,281 @@
+# datos/esquema.py
+"""Esquema de las fuentes: contrato de columnas y categóricas compartidas.
+
+validar() se aplica una sola vez, al convertir cada Excel: asegura las
+columnas del contrato, convierte los tipos y separa las filas que no lo
+cumplen (vacíos no permitidos, valores no convertibles o fuera de rango, o
+una clave repetida), todo con operaciones vectorizadas. Los callbacks pueden contar con esas
+columnas y tipos sin revisarlos en cada petición.
+
+Los nombres de municipio se llevan al nombre del TopoJSON (mayúsculas, sin
+tildes, con los alias de datos/municipios) y todas las fuentes usan el mismo
+CategoricalDtype de municipios; filtros y cruces usan esa clave y la
+interfaz muestra la escritura original (nombres_municipio). Evento, EPS, categoría e indicador quedan
+como categóricas con las categorías ordenadas. Un filtro por igualdad
+compara códigos enteros y la lista ordenada de valores de un dropdown sale
+de las categorías, sin ordenar en cada petición.
+"""
+from collections import namedtuple
+
+from arranque import perezoso
+from datos.geometria import codigos_dane
+from datos.municipios import ALIAS, normalizar_nombre
+
+np = perezoso("numpy")
+pd = perezoso("pandas")
+
+# tipo: "texto", "numero" o "fecha"; vacios: si se aceptan celdas vacías;
+# rango: (mínimo, máximo) inclusivo, None = sin límite; opcional: la columna puede faltar
+Columna = namedtuple("Columna", "tipo vacios rango opcional", defaults=(True, None, False))
+
+
+class ErrorEsquema(ValueError):
+    """El archivo no cumple el contrato de su fuente (p. ej. falta una columna)."""
+
+
+# fuente -> {columna: Columna}; "*" se aplica a las columnas no listadas
+CONTRATOS = {
+    "indicadores": {
+        "Año": Columna("numero", vacios=False, rango=(1990, 2100)),
+        "Municipio": Columna("texto", vacios=False),
+        "Indicador": Columna("texto", vacios=False),
+        "Numerador": Columna("numero", rango=(0, None)),
+        "Denominador": Columna("numero", rango=(0, None)),
+        "Valor (%)": Columna("numero", vacios=False, rango=(0, 100)),
+        "Meta (%)": Columna("numero", rango=(0, 100)),
+        "Categoría": Columna("texto", vacios=False),
+    },
+    # El resumen de CPN viene por municipio o por indicador (una columna por mes)
+    "cpn": {
+        "Municipio": Columna("texto", vacios=False, opcional=True),
+        "Indicador": Columna("texto", vacios=False, opcional=True),
+        "*": Columna("numero"),
+    },
+    "gestantes": {
+        "Municipio": Columna("texto", vacios=False),
+        "Gestantes Activas": Columna("numero", vacios=False, rango=(0, None)),
+        "*": Columna("numero", rango=(0, None)),
+    },
+    "sifilis": {
+        "evento": Columna("texto", vacios=False),
+        "municipio": Columna("texto", vacios=False),
+        "eps": Columna("texto"),
+        "fecha_notif": Columna("fecha"),
+        "semana": Columna("numero", vacios=False, rango=(1, 53)),
+        "casos": Columna("numero", vacios=False, rango=(0, None)),
+        "edad": Columna("numero", rango=(0, 120), opcional=True),
+        "sem_gestacion": Columna("numero", rango=(0, 45), opcional=True),
+    },
+}
+
+_CONVERSIONES = {
+    "numero": lambda s: pd.to_numeric(s, errors="coerce"),
+    "fecha": lambda s: pd.to_datetime(s, errors="coerce"),
+}
+_VACIOS = {"texto": object, "numero": "float64", "fecha": "datetime64[ns]"}
+
+
+def _contrato_columnas(nombre, columnas):
+    contrato = CONTRATOS[nombre]
+    faltantes = [c for c, regla in contrato.items() if c != "*" and not regla.opcional and c not in columnas]
+    if faltantes:
+        raise ErrorEsquema(f"{nombre}: faltan las columnas {', '.join(faltantes)}")
+    resto = contrato.get("*")
+    return {c: contrato.get(c, resto) for c in columnas if contrato.get(c, resto) is not None}
+
+
+def validar(nombre, df):
+    """(filas válidas con los tipos del contrato, filas descartadas con su motivo).
+
+    Lanza ErrorEsquema si falta una columna obligatoria.
+    """
+    reglas = _contrato_columnas(nombre, df.columns)
+    df = df.reset_index(drop=True)
+    motivos = np.full(len(df), None, dtype=object)
+
+    def descartar(mascara, motivo):
+        mascara = np.asarray(mascara, dtype=bool) & pd.isna(motivos)
+        motivos[mascara] = motivo
+
+    columnas = {}
+    for columna, regla in reglas.items():
+        serie = df[columna]
+        vacia = serie.isna().to_numpy()
+        if regla.tipo in _CONVERSIONES:
+            serie = _CONVERSIONES[regla.tipo](serie)
+            descartar(serie.isna().to_numpy() & ~vacia, f"{columna}: no es {regla.tipo}")
+            columnas[columna] = serie
+        if not regla.vacios:
+            descartar(vacia, f"{columna}: vacío")
+        if regla.rango is not None:
+            minimo, maximo = regla.rango
+            fuera = np.zeros(len(df), dtype=bool)
+            if minimo is not None:
+                fuera |= (serie < minimo).to_numpy()
+            if maximo is not None:
+                fuera |= (serie > maximo).to_numpy()
+            descartar(fuera, f"{columna}: fuera de [{minimo}, {maximo}]")
+
+    tipadas = df.assign(**columnas) if columnas else df
+    clave = CLAVES.get(nombre)
+    repetidas = None
+    if clave and all(c in df.columns for c in clave):
+        repetidas = _repetidas(tipadas, clave, MUNICIPIO[nombre], pd.isna(motivos))
+        if nombre not in SUMABLES:
+            descartar(repetidas, f"{', '.join(clave)}: repetido")
+
+    validas = pd.isna(motivos)
+    # Las descartadas se guardan con los valores originales, para poder corregirlas
+    descartadas = df[~validas].assign(motivo=motivos[~validas])
+    if nombre in SUMABLES and repetidas is not None and repetidas.any():
+        sumadas = _sumar(tipadas[repetidas], clave, MUNICIPIO[nombre])
+        print(f"{nombre}: {int(repetidas.sum())} filas con {', '.join(clave)} repetido sumadas en {len(sumadas)}")
+        return pd.concat([tipadas[validas & ~repetidas], sumadas], ignore_index=True), descartadas
+    return tipadas[validas].reset_index(drop=True), descartadas
+
+
+def _repetidas(df, clave, municipio, validas):
+    """Filas válidas cuya clave se repite, comparando los municipios ya normalizados."""
+    claves = df[clave]
+    if municipio in clave:
+        nombres = {m: nombre_municipio(m) for m in claves[municipio].dropna().unique()}
+        claves = claves.assign(**{municipio: claves[municipio].map(nombres)})
+    return claves[validas].duplicated(keep=False).reindex(df.index, fill_value=False).to_numpy()
+
+
+def _sumar(df, clave, municipio):
+    """Una fila por clave con la suma de las demás columnas (todas numéricas por contrato)."""
+    if municipio in clave:
+        df = df.assign(**{municipio: df[municipio].map(nombre_municipio)})
+    return df.groupby(clave, sort=False, as_index=False).sum(min_count=1)
+
+
+def version(nombre):
+    """Todo lo que cambia el resultado de validar(): invalida las conversiones guardadas."""
+    return repr((CONTRATOS[nombre], CLAVES.get(nombre), nombre in SUMABLES, sorted(ALIAS.items())))
+
+
+def vacio(nombre):
+    """DataFrame sin filas con las columnas obligatorias del contrato (fuente ausente)."""
+    return pd.DataFrame({c: pd.Series(dtype=_VACIOS[regla.tipo]) for c, regla in CONTRATOS[nombre].items()
+                         if c != "*" and not regla.opcional})
+
+
+# fuente -> columnas de municipio y demás columnas categóricas
+MUNICIPIO = {"indicadores": "Municipio", "cpn": "Municipio", "gestantes": "Municipio", "sifilis": "municipio"}
+CATEGORICAS = {
+    "indicadores": ["Categoría", "Indicador"],
+    "cpn": ["Indicador"],
+    "sifilis": ["evento", "eps"],
+}
+
+
+# Columnas que identifican una fila, con el municipio ya normalizado. Las
+# filas que repiten clave (también dos nombres que se vuelven el mismo
+# municipio, p. ej. "PATI A" y "PATIA") van a cuarentena; en las fuentes de
+# SUMABLES son conteos y se suman en una sola fila con el nombre normalizado.
+CLAVES = {
+    "indicadores": ["Año", "Municipio", "Categoría", "Indicador"],
+    "gestantes": ["Municipio"],
+}
+SUMABLES = {"gestantes"}
+
+# Etiquetas de la columna de municipio que no son un municipio (ya normalizadas)
+NO_MUNICIPALES = {"CAUCA"}
+
+
+def nombre_municipio(nombre):
+    """Nombre normalizado del municipio (también Guachené u otros sin polígono);
+    las etiquetas que no son municipios, como 'Cauca (global)', quedan tal cual."""
+    normalizado = normalizar_nombre(nombre)
+    return nombre if normalizado in NO_MUNICIPALES else normalizado
+
+
+def _categorica(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.array
+    return pd.Categorical(serie.astype(object).where(serie.notna(), None))
+
+
+def recodificar(serie, tipo, normalizar=None):
+    """Serie categórica con el dtype `tipo`.
+
+    La normalización y la búsqueda de cada categoría se hacen una vez por
+    valor distinto; las filas solo se recodifican con un arreglo de enteros.
+    """
+    original = _categorica(serie)
+    if normalizar is None and original.dtype == tipo:
+        return serie
+    categorias = original.categories
+    if normalizar is not None:
+        categorias = categorias.map(normalizar)
+    # Posición de cada categoría original en el dtype destino, más -1 para los vacíos
+    destino = np.append(tipo.categories.get_indexer(categorias), -1)
+    codigos = destino[original.codes]
+    return pd.Series(pd.Categorical.from_codes(codigos, dtype=tipo), index=serie.index, name=serie.name)
+
+
+def tipo_municipio(fuentes):
+    """CategoricalDtype único para los municipios de todas las fuentes."""
+    nombres = set(codigos_dane())
+    for nombre, columna in MUNICIPIO.items():
+        df = fuentes.get(nombre)
+        if df is not None and columna in df.columns:
+            nombres.update(nombre_municipio(m) for m in _categorica(df[columna]).categories)
+    return pd.CategoricalDtype(sorted(nombres, key=str))
+
+
+def nombres_municipio(fuentes):
+    """Clave normalizada -> nombre para mostrar ('POPAYAN' -> 'Popayán').
+
+    Es la primera escritura original de las fuentes (en el orden de MUNICIPIO);
+    los municipios que ninguna fuente trae se muestran con su clave.
+    """
+    nombres = {}
+    for nombre, columna in MUNICIPIO.items():
+        df = fuentes.get(nombre)
+        if df is not None and columna in df.columns:
+            for m in _categorica(df[columna]).categories:
+                nombres.setdefault(nombre_municipio(m), m)
+    return nombres
+
+
+def mostrar_municipios(df, nombres):
+    """df con el nombre para mostrar en su columna de municipio (tablas, exportación y mapas)."""
+    for columna in set(MUNICIPIO.values()):
+        if columna in df.columns and isinstance(df[columna].dtype, pd.CategoricalDtype):
+            categorias = df[columna].cat.categories
+            return df.assign(**{columna: df[columna].cat.rename_categories([nombres.get(c, c) for c in categorias])})
+    return df
+
+
+def aplicar(fuentes):
+    """Copia del dict de fuentes con las columnas del esquema ya categóricas.
+
+    Solo se reemplazan esas columnas (los demás arreglos se comparten) y se
+    conservan los attrs de cada DataFrame.
+    """
+    municipios = tipo_municipio(fuentes)
+    resultado = dict(fuentes)
+    for nombre, df in fuentes.items():
+        columnas = {}
+        columna = MUNICIPIO.get(nombre)
+        if columna in df.columns:
+            columnas[columna] = recodificar(df[columna], municipios, nombre_municipio)
+        for columna in CATEGORICAS.get(nombre, []):
+            if columna in df.columns:
+                valores = _categorica(df[columna]).categories
+                columnas[columna] = recodificar(df[columna], pd.CategoricalDtype(sorted(valores, key=str)))
+        if columnas:
+            nuevo = df.assign(**columnas)
+            nuevo.attrs = dict(df.attrs)
+            resultado[nombre] = nuevo
+    return resultado
+
+
+def valores(serie):
+    """Valores presentes en la columna, ordenados (sin vacíos)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = np.unique(serie.cat.codes.to_numpy())
+        return list(serie.cat.categories[codigos[codigos >= 0]])
+    return sorted(serie.dropna().unique())
@@ -0,0 +1,149 @@
+# datos/geometria.py
+"""Geometría municipal del Cauca a partir del TopoJSON incluido en data/.
+
+data/cauca_municipios.geojson.json es en realidad un TopoJSON con todos los
+municipios de Colombia. Aquí se decodifica una vez, se filtra por
+departamento, se simplifican los arcos (Douglas-Peucker) y se guarda un
+GeoJSON compacto con el código DANE como id de cada feature.
+
+Se simplifican los arcos y no los polígonos: como los arcos son compartidos
+entre municipios vecinos, los límites simplificados siguen coincidiendo y
+no aparecen huecos entre polígonos.
+"""
+import functools
+import json
+import os
+
+from arranque import perezoso
+import config
+from datos import cache_columnar
+from datos.municipios import normalizar_nombre
+
+np = perezoso("numpy")
+
+ARCHIVO_TOPOJSON = "cauca_municipios.geojson.json"
+
+
+def _arcos_absolutos(topo):
+    """Decodifica los arcos cuantizados (deltas) a coordenadas."""
+    transformacion = topo.get("transform")
+    arcos = []
+    for arco in topo["arcs"]:
+        puntos = np.asarray(arco, dtype=float)
+        if transformacion:
+            puntos = np.cumsum(puntos, axis=0) * transformacion["scale"] + transformacion["translate"]
+        arcos.append(puntos)
+    return arcos
+
+
+def simplificar(puntos, tolerancia):
+    """Douglas-Peucker: conserva los extremos y los puntos que se alejan más de `tolerancia`."""
+    if tolerancia <= 0 or len(puntos) <= 2:
+        return puntos
+    conservar = np.zeros(len(puntos), dtype=bool)
+    conservar[[0, -1]] = True
+    pendientes = [(0, len(puntos) - 1)]
+    while pendientes:
+        inicio, fin = pendientes.pop()
+        if fin - inicio < 2:
+            continue
+        a, b = puntos[inicio], puntos[fin]
+        tramo = puntos[inicio + 1:fin]
+        ab = b - a
+        largo = np.hypot(*ab)
+        if largo == 0:
+            distancias = np.hypot(*(tramo - a).T)
+        else:
+            distancias = np.abs(ab[0] * (tramo[:, 1] - a[1]) - ab[1] * (tramo[:, 0] - a[0])) / largo
+        i = int(np.argmax(distancias))
+        if distancias[i] > tolerancia:
+            medio = inicio + 1 + i
+            conservar[medio] = True
+            pendientes.append((inicio, medio))
+            pendientes.append((medio, fin))
+    return puntos[conservar]
+
+
+def _anillo(indices, arcos):
+    """Une los arcos de un anillo (índice negativo = arco invertido)."""
+    partes = []
+    for n, i in enumerate(indices):
+        arco = arcos[i] if i >= 0 else arcos[~i][::-1]
+        partes.append(arco if n == 0 else arco[1:])  # el primer punto repite el último del arco anterior
+    return np.concatenate(partes)
+
+
+def construir_geojson(topo, departamento="CAUCA", tolerancia=0.0, decimales=4):
+    """FeatureCollection del departamento, un feature por código DANE."""
+    geometrias = [g for g in topo["objects"]["mpios"]["geometries"]
+                  if g.get("properties", {}).get("dpt") == departamento]
+    originales = _arcos_absolutos(topo)
+
+    usados = {i if i >= 0 else ~i
+              for g in geometrias
+              for poligono in (g["arcs"] if g["type"] == "MultiPolygon" else [g["arcs"]])
+              for anillo in poligono for i in anillo}
+    simplificados = {i: simplificar(originales[i], tolerancia) for i in usados}
+
+    poligonos_por_codigo = {}
+    nombres = {}
+    for g in geometrias:
+        poligonos = g["arcs"] if g["type"] == "MultiPolygon" else [g["arcs"]]
+        for poligono in poligonos:
+            anillos = []
+            for indices in poligono:
+                anillo = _anillo(indices, simplificados)
+                if len(anillo) < 4:  # la simplificación colapsó el anillo
+                    anillo = _anillo(indices, originales)
+                anillos.append(np.round(anillo, decimales).tolist())
+            poligonos_por_codigo.setdefault(g["id"], []).append(anillos)
+        nombres[g["id"]] = g["properties"]["name"]
+
+    features = []
+    for codigo, poligonos in sorted(poligonos_por_codigo.items()):
+        geometria = ({"type": "Polygon", "coordinates": poligonos[0]} if len(poligonos) == 1
+                     else {"type": "MultiPolygon", "coordinates": poligonos})
+        features.append({
+            "type": "Feature",
+            "id": codigo,
+            "properties": {"name": nombres[codigo]},
+            "geometry": geometria,
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+@functools.lru_cache(maxsize=4)
+def geometria_cauca(tolerancia=None):
+    """GeoJSON simplificado del Cauca; se calcula una vez y queda en CACHE_DIR."""
+    tolerancia = config.TOLERANCIA_GEOMETRIA if tolerancia is None else tolerancia
+    ruta = os.path.join(config.DATA_DIR, ARCHIVO_TOPOJSON)
+
+    try:
+        clave = cache_columnar.clave_cache(ruta, extra=f"cauca|{tolerancia}")
+        ruta_cache = os.path.join(config.CACHE_DIR, f"{clave}.geojson")
+        if os.path.exists(ruta_cache):
+            with open(ruta_cache, encoding="utf-8") as f:
+                return json.load(f)
+    except OSError:
+        ruta_cache = None
+
+    with open(ruta, encoding="utf-8") as f:
+        geojson = construir_geojson(json.load(f), "CAUCA", tolerancia)
+
+    if ruta_cache:
+        try:
+            cache_columnar.escribir_json(ruta_cache, geojson)
+        except OSError as e:
+            print(f"No se pudo guardar la geometría en caché: {e}")
+    return geojson
+
+
+@functools.lru_cache(maxsize=1)
+def codigos_dane():
+    """Nombre normalizado -> código DANE de los municipios del Cauca."""
+    return {f["properties"]["name"]: f["id"] for f in geometria_cauca()["features"]}
+
+
+def codigo_municipio(nombre):
+    """Código DANE del municipio (None si no está en el Cauca)."""
+    return codigos_dane().get(normalizar_nombre(nombre))
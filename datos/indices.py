@@ -0,0 +1,35 @@
+# datos/indices.py
+"""Índices de filas precalculados para los filtros de los callbacks."""
+from arranque import perezoso
+
+np = perezoso("numpy")
+
+
+class IndiceFilas:
+    """Posiciones de fila por clave, calculadas una vez al cargar los datos.
+
+    filas("Control Prenatal", "POPAYAN") es una búsqueda en un dict más un
+    iloc sobre las filas de esa clave, en vez de una máscara booleana sobre
+    toda la tabla.
+    """
+
+    def __init__(self, df, columnas):
+        self._df = df
+        self._columnas = list(columnas)
+        if df.empty or not set(self._columnas) <= set(df.columns):
+            self._posiciones = {}
+        else:
+            self._posiciones = df.groupby(self._columnas, sort=False, observed=True).indices
+        self._vacio = df.iloc[:0]
+
+    def posiciones(self, *clave):
+        clave = clave[0] if len(self._columnas) == 1 else clave
+        return self._posiciones.get(clave, np.empty(0, dtype=np.intp))
+
+    def filas(self, *clave):
+        """Subconjunto de filas de la clave (vacío si no existe)."""
+        pos = self.posiciones(*clave)
+        return self._df.iloc[pos] if len(pos) else self._vacio
+
+    def claves(self):
+        return self._posiciones.keys()
@@ -0,0 +1,215 @@
+# datos/ingesta.py
+"""Ingesta incremental de las fuentes que solo crecen (p. ej. sífilis semanal).
+
+Cada fuente tiene un almacén en CACHE_DIR/<nombre>-incremental/ formado por
+segmentos columnares (cache_columnar) y un estado.json con:
+
+* marca: la fecha más reciente ya ingresada (columna de marca, p. ej. fecha_notif);
+* filas y huella de las filas con fecha <= marca (suma de hash por fila);
+* la lista de segmentos, en orden.
+
+Cuando el Excel cambia se lee de nuevo (un xlsx no se puede leer a medias),
+pero solo las filas posteriores a la marca se convierten, se guardan como
+segmento nuevo y se entregan al cubo semanal. Si las filas ya ingresadas no
+coinciden en cantidad o huella (correcciones, notificaciones tardías con fecha
+anterior a la marca) el almacén se reconstruye completo.
+"""
+import os
+import secrets
+import shutil
+import threading
+from contextlib import contextmanager
+
+from arranque import perezoso
+import config
+from datos import cache_columnar
+
+np = perezoso("numpy")
+pd = perezoso("pandas")
+
+try:
+    import fcntl
+except ImportError:  # Windows: un solo proceso en desarrollo
+    fcntl = None
+
+# Subir este número descarta los almacenes escritos con el formato anterior
+VERSION_ALMACEN = 1
+
+# Con más segmentos que esto se reescribe el almacén en uno solo
+MAX_SEGMENTOS = 16
+
+
+def huella_filas(df):
+    """Suma (módulo 2**64) del hash de cada fila: no depende del orden y se puede acumular."""
+    if df.empty:
+        return 0
+    return int(pd.util.hash_pandas_object(df, index=False).to_numpy().sum(dtype=np.uint64))
+
+
+def concatenar(partes):
+    """Une los segmentos; las categóricas se unen por sus diccionarios, sin pasar por textos."""
+    columnas = {}
+    for columna in partes[0].columns:
+        series = [parte[columna] for parte in partes]
+        if all(isinstance(serie.dtype, pd.CategoricalDtype) for serie in series):
+            columnas[columna] = pd.api.types.union_categoricals([serie.array for serie in series], sort_categories=True)
+        else:
+            columnas[columna] = pd.concat(series, ignore_index=True)
+    return pd.DataFrame(columnas)
+
+
+class AlmacenIncremental:
+    def __init__(self, nombre, ruta, columna_marca, convertir, directorio=None, version=""):
+        """
+        ruta: Excel de origen; columna_marca: fecha con la que se detectan las filas nuevas.
+        convertir(df): valida y convierte las filas (solo se llama con filas nuevas).
+        version: si cambia (p. ej. el contrato de la fuente) el almacén se reconstruye.
+        """
+        self.nombre = nombre
+        self.ruta = ruta
+        self.columna_marca = columna_marca
+        self.convertir = convertir
+        self.version = version
+        self.directorio = directorio or os.path.join(config.CACHE_DIR, f"{nombre}-incremental")
+        self._memo = None  # (id del almacén, DataFrame ya leído) de este proceso
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _bloqueo(self, exclusivo):
+        # Entre workers: uno ingiere mientras los demás esperan para leer
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(os.path.join(self.directorio, ".lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            yield
+
+    def _estado(self):
+        estado = cache_columnar._leer_json(os.path.join(self.directorio, "estado.json"))
+        # Los segmentos dependen también del formato de la caché columnar
+        if estado is None or estado.get("formato") != [VERSION_ALMACEN, cache_columnar.VERSION_FORMATO] \
+                or estado.get("version") != self.version:
+            return None
+        return estado
+
+    def _firma(self):
+        st = os.stat(self.ruta)
+        return [st.st_mtime_ns, st.st_size]
+
+    def cargar(self):
+        """DataFrame completo de la fuente.
+
+        attrs["almacen"] identifica el almacén y attrs["filas_previas"] cuántas
+        filas ya tenía la carga anterior de este proceso: las siguientes son
+        las nuevas (Instantanea amplía el cubo solo con ellas).
+        """
+        with self._lock:
+            with self._bloqueo(exclusivo=False):
+                estado = self._estado()
+            if estado is None or estado["firma"] != self._firma():
+                with self._bloqueo(exclusivo=True):
+                    estado = self._ingerir()
+            with self._bloqueo(exclusivo=False):
+                return self._leer(self._estado() or estado)
+
+    def _ingerir(self):
+        """Agrega al almacén las filas posteriores a la marca (o lo rehace)."""
+        estado = self._estado()
+        firma = self._firma()
+        if estado is not None and estado["firma"] == firma:
+            # Otro worker ya lo ingirió mientras se esperaba el bloqueo
+            return estado
+
+        crudo = pd.read_excel(self.ruta)
+        if self.columna_marca not in crudo.columns:
+            return self._reconstruir(crudo, firma, marca=None)
+        fechas = pd.to_datetime(crudo[self.columna_marca], errors="coerce")
+
+        if estado is None or estado["columnas"] != [str(c) for c in crudo.columns] or estado["marca"] is None:
+            return self._reconstruir(crudo, firma, fechas.max())
+
+        marca = pd.Timestamp(estado["marca"])
+        # Las fechas vacías cuentan como historia: si aparecen nuevas, no cuadra y se rehace
+        nuevas = (fechas > marca).to_numpy()
+        historia = crudo[~nuevas]
+        if len(historia) != estado["filas"] or huella_filas(historia) != estado["huella"]:
+            print(f"{self.nombre}: cambiaron filas anteriores a {marca.date()}, se reconstruye el almacén")
+            return self._reconstruir(crudo, firma, fechas.max())
+
+        delta = crudo[nuevas]
+        if not delta.empty:
+            segmento = self._guardar_segmento(self.convertir(delta.reset_index(drop=True)), estado["siguiente"])
+            estado["segmentos"].append(segmento)
+            estado["siguiente"] += 1
+            estado["marca"] = fechas[nuevas].max().isoformat()
+            estado["filas"] += len(delta)
+            estado["huella"] = (estado["huella"] + huella_filas(delta)) % 2 ** 64
+            print(f"{self.nombre}: {len(delta)} filas nuevas hasta {estado['marca'][:10]}")
+        estado["firma"] = firma
+
+        if len(estado["segmentos"]) > MAX_SEGMENTOS:
+            estado = self._compactar(estado)
+        cache_columnar.escribir_json(os.path.join(self.directorio, "estado.json"), estado)
+        self._limpiar(estado)
+        return estado
+
+    def _reconstruir(self, crudo, firma, marca):
+        estado = {
+            "formato": [VERSION_ALMACEN, cache_columnar.VERSION_FORMATO],
+            "version": self.version,
+            "id": secrets.token_hex(6),
+            "firma": firma,
+            "columnas": [str(c) for c in crudo.columns],
+            "marca": marca.isoformat() if marca is not None and not pd.isna(marca) else None,
+            "filas": len(crudo),
+            "huella": huella_filas(crudo),
+            "segmentos": [self._guardar_segmento(self.convertir(crudo), 0)],
+            "siguiente": 1,
+        }
+        cache_columnar.escribir_json(os.path.join(self.directorio, "estado.json"), estado)
+        self._limpiar(estado)
+        return estado
+
+    def _guardar_segmento(self, df, numero):
+        nombre = f"seg-{numero:05d}"
+        directorio = os.path.join(self.directorio, nombre)
+        shutil.rmtree(directorio, ignore_errors=True)  # restos de una ingesta interrumpida
+        cache_columnar.guardar(df, directorio)
+        return {"nombre": nombre, "filas": len(df)}
+
+    def _compactar(self, estado):
+        # Mismo contenido y orden en un solo segmento: el id no cambia
+        df = self._leer(estado)
+        estado["segmentos"] = [self._guardar_segmento(df, estado["siguiente"])]
+        estado["siguiente"] += 1
+        return estado
+
+    def _limpiar(self, estado):
+        vigentes = {s["nombre"] for s in estado["segmentos"]}
+        for entrada in os.listdir(self.directorio):
+            if entrada.startswith("seg-") and entrada not in vigentes:
+                shutil.rmtree(os.path.join(self.directorio, entrada), ignore_errors=True)
+
+    def _leer(self, estado):
+        # Con el mismo almacén, lo ya leído en este proceso es un prefijo: solo
+        # se leen las filas siguientes
+        previo = self._memo[1] if self._memo and self._memo[0] == estado["id"] else None
+        if previo is not None and len(previo) > sum(s["filas"] for s in estado["segmentos"]):
+            previo = None
+        desde = 0 if previo is None else len(previo)
+
+        partes = [] if previo is None else [previo]
+        inicio = 0
+        for segmento in estado["segmentos"]:
+            fin = inicio + segmento["filas"]
+            if fin > desde:
+                df = cache_columnar.cargar(os.path.join(self.directorio, segmento["nombre"]), mmap=config.MMAP)
+                if df is None:
+                    raise OSError(f"segmento incompleto en {self.directorio}: {segmento['nombre']}")
+                partes.append(df.iloc[max(desde - inicio, 0):])
+            inicio = fin
+
+        # Objeto nuevo aunque no haya filas nuevas: los attrs del anterior no se tocan
+        df = partes[0].copy(deep=False) if len(partes) == 1 else concatenar(partes)
+        df.attrs = {"almacen": estado["id"], "filas_previas": desde if previo is not None else None}
+        self._memo = (estado["id"], df)
+        return df
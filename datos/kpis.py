@@ -0,0 +1,58 @@
+# datos/kpis.py
+"""KPIs del panel superior, calculados una vez por versión de datos."""
+from arranque import perezoso
+
+np = perezoso("numpy")
+pd = perezoso("pandas")
+
+# grupo -> (columna, palabras clave en minúsculas). Una fila puede estar en varios grupos.
+GRUPOS = {
+    "cpn": ("Indicador", ("cpn", "prenatal")),
+    "parto": ("Indicador", ("parto", "institucional")),
+    "violencia": ("Categoría", ("violencia", "sexual")),
+}
+
+
+def etiquetar(df):
+    """Matriz booleana filas × GRUPOS.
+
+    Las palabras se buscan solo en los valores distintos de cada columna
+    (unas decenas de textos) y el resultado se lleva a las filas con los
+    códigos de factorize, sin regex sobre toda la tabla.
+    """
+    marcas = np.zeros((len(df), len(GRUPOS)), dtype=bool)
+    for j, (columna, palabras) in enumerate(GRUPOS.values()):
+        if columna not in df.columns:
+            continue
+        codigos, valores = pd.factorize(df[columna])
+        en_grupo = np.array([any(p in str(v).lower() for p in palabras) for v in valores] + [False])
+        marcas[:, j] = en_grupo[codigos]  # el código -1 (vacío) apunta al False final
+    return marcas
+
+
+def calcular(df):
+    """Dict con los cuatro valores del panel (None si faltan columnas)."""
+    try:
+        marcas = etiquetar(df)
+        valores = df["Valor (%)"].to_numpy(dtype=float)
+        presentes = ~np.isnan(valores)
+
+        # Una sola pasada para todos los grupos: sumas, conteos y filas por grupo
+        grupos = marcas.T.astype(float)
+        sumas = grupos @ np.where(presentes, valores, 0.0)
+        conteos = grupos @ presentes
+        filas = marcas.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            medias = dict(zip(GRUPOS, sumas / conteos))
+
+        # Si no hay datos específicos, se usa el promedio general
+        general = valores[presentes].mean() if presentes.any() else (np.nan if len(df) else 0)
+        return {
+            "cobertura_cpn": general if np.isnan(medias["cpn"]) else medias["cpn"],
+            "parto_inst": general if np.isnan(medias["parto"]) else medias["parto"],
+            "casos_vs": int(filas[list(GRUPOS).index("violencia")]),
+            "municipios": df["Municipio"].nunique(),
+        }
+    except Exception as e:
+        print(f"Error en KPIs: {e}")
+        return None
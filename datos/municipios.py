@@ -0,0 +1,23 @@
+# datos/municipios.py
+"""Normalización de nombres de municipio y su código DANE."""
+import re
+import unicodedata
+
+# Variantes de escritura que aparecen en los Excel -> nombre del TopoJSON
+ALIAS = {
+    "PATI A": "PATIA",
+    "SANTANDER": "SANTANDER DE QUILICHAO",
+    "LOPEZ DE MICAY": "LOPEZ",
+    "VILLARICA": "VILLA RICA",
+}
+
+
+def normalizar_nombre(nombre):
+    """'Popayán' -> 'POPAYAN', 'PATIA (EL BORDO)' -> 'PATIA', 'López de Micay' -> 'LOPEZ'."""
+    if not isinstance(nombre, str):
+        return nombre
+    texto = unicodedata.normalize("NFKD", nombre)
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).upper()
+    texto = re.sub(r"\s*\(.*?\)\s*", " ", texto)
+    texto = re.sub(r"\s+", " ", texto).strip()
+    return ALIAS.get(texto, texto)
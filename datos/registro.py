@@ -0,0 +1,200 @@
+# datos/registro.py
+"""Registro versionado de los datos del tablero.
+
+Los callbacks nunca leen DataFrames globales: piden registro.actual() una
+vez y trabajan con esa instantánea hasta terminar. Una recarga arma la
+instantánea nueva completa y solo entonces la publica (una asignación), de
+modo que una petición en curso nunca ve datos a medio cargar.
+"""
+import hashlib
+import itertools
+import os
+import threading
+import time
+
+from datos.carga import FUENTES, cargar_fuente, ruta_fuente
+from datos import esquema, kpis, semaforo
+from datos.indices import IndiceFilas
+from datos.resumen_cpn import ResumenCPN
+from datos.sifilis import CuboSifilis, es_ampliacion
+
+
+class Instantanea:
+    """Datos de una versión concreta. No se modifica después de publicarse."""
+
+    def __init__(self, version, fuentes, anterior=None):
+        self.version = version
+        # Textos como categóricas; municipios normalizados con un diccionario común
+        self.nombres_municipio = esquema.nombres_municipio(fuentes)
+        fuentes = esquema.aplicar(fuentes)
+        self.indicadores = fuentes["indicadores"]
+        self.cpn = fuentes["cpn"]
+        self.gestantes = fuentes["gestantes"]
+        self.sifilis = fuentes["sifilis"]
+
+        # Búsquedas O(1) para los filtros por categoría y municipio
+        self.por_categoria_municipio = IndiceFilas(self.indicadores, ("Categoría", "Municipio"))
+        self.por_municipio = IndiceFilas(self.indicadores, ("Municipio",))
+
+        # Semáforo de todas las filas, en el mismo orden que indicadores
+        self.semaforo = self.indicadores.reindex(columns=["Indicador", "Valor (%)", "Meta (%)"]).assign(
+            Estado=semaforo.etiquetas(semaforo.niveles_tabla(self.indicadores))
+        )
+
+        # Valores del panel de KPIs de esta versión
+        self.kpis = kpis.calcular(self.indicadores)
+
+        # Promedios de CPN por municipio para las vistas resumen y barras
+        self.resumen_cpn = ResumenCPN(self.cpn)
+
+        # Si el extracto de sífilis solo creció, se amplía el cubo anterior: el
+        # almacén incremental ya dice cuántas filas había, sin comparar la historia
+        previas = self.sifilis.attrs.get("filas_previas")
+        if anterior is not None and previas is not None and previas == len(anterior.sifilis) \
+                and anterior.sifilis.attrs.get("almacen") == self.sifilis.attrs.get("almacen"):
+            self.cubo_sifilis = anterior.cubo_sifilis.ampliado(self.sifilis.iloc[previas:])
+        elif anterior is not None and es_ampliacion(anterior.sifilis, self.sifilis):
+            self.cubo_sifilis = anterior.cubo_sifilis.ampliado(self.sifilis.iloc[len(anterior.sifilis):])
+        else:
+            self.cubo_sifilis = CuboSifilis(self.sifilis)
+
+    def nombre_municipio(self, clave):
+        """Nombre para mostrar del municipio (los filtros usan la clave normalizada)."""
+        return self.nombres_municipio.get(clave, clave)
+
+    def opciones_municipio(self, claves):
+        """Opciones de un dropdown de municipios: se muestra el nombre, el valor es la clave."""
+        return [{"label": self.nombre_municipio(m), "value": m} for m in claves]
+
+    def con_nombres(self, df):
+        return esquema.mostrar_municipios(df, self.nombres_municipio)
+
+
+def firma_archivos(nombres=FUENTES):
+    """mtime y tamaño de cada fuente; cambia cuando se reemplaza un Excel."""
+    firmas = {}
+    for nombre in nombres:
+        try:
+            st = os.stat(ruta_fuente(nombre))
+            firmas[nombre] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            firmas[nombre] = None
+    return firmas
+
+
+def _version(firmas):
+    # Igual en todos los workers que vean los mismos archivos
+    return hashlib.sha1(repr(sorted(firmas.items())).encode("utf-8")).hexdigest()[:12]
+
+
+class RegistroDatos:
+    def __init__(self, cargar=cargar_fuente, respaldo=None, fuentes=None):
+        """fuentes: las que se cargan (las de los componentes habilitados); None = todas.
+        Las demás quedan vacías con las columnas de su contrato."""
+        self._cargar = cargar
+        self._respaldo = respaldo or {}
+        self.fuentes = [nombre for nombre in FUENTES if fuentes is None or nombre in fuentes]
+        self._actual = None
+        self._firmas = None
+        self._lock = threading.Lock()
+        self._oyentes = []
+        self._pid_vigilancia = None
+        self._contador = itertools.count(1)
+        self._carga_inicial = None
+        self._error_carga = None
+
+    def actual(self):
+        """Instantánea vigente; si la primera carga corre en segundo plano, la espera."""
+        if self._actual is None and self._carga_inicial is not None:
+            self._carga_inicial.wait()
+            if self._actual is None:
+                raise RuntimeError(f"No se pudieron cargar los datos: {self._error_carga}")
+        return self._actual
+
+    def lista(self):
+        """True si ya hay una instantánea publicada."""
+        return self._actual is not None
+
+    def al_publicar(self, funcion):
+        """Registra una función que recibe cada instantánea nueva (p. ej. para invalidar cachés)."""
+        self._oyentes.append(funcion)
+        return funcion
+
+    def publicar(self, fuentes, version=None):
+        """Publica un conjunto completo de fuentes como versión nueva."""
+        nueva = Instantanea(version or f"manual-{next(self._contador)}", fuentes, anterior=self._actual)
+        self._actual = nueva
+        for funcion in self._oyentes:
+            try:
+                funcion(nueva)
+            except Exception as e:
+                print(f"Error al invalidar tras la recarga: {e}")
+        return nueva
+
+    def recargar(self):
+        """Carga las fuentes habilitadas y publica la instantánea si algo cambió."""
+        with self._lock:
+            firmas = firma_archivos(self.fuentes)
+            if firmas == self._firmas and self._actual is not None:
+                return self._actual
+
+            fuentes = {nombre: esquema.vacio(nombre) for nombre in FUENTES if nombre not in self.fuentes}
+            for nombre in self.fuentes:
+                try:
+                    fuentes[nombre] = self._cargar(nombre)
+                except FileNotFoundError:
+                    if nombre not in self._respaldo:
+                        raise
+                    fuentes[nombre] = self._respaldo[nombre]()
+
+            self._firmas = firmas
+            return self.publicar(fuentes, version=_version(firmas))
+
+    def iniciar_carga(self, funcion=None):
+        """Hace la primera carga en un hilo de fondo con `funcion` (por defecto recargar).
+
+        Mientras tanto actual() espera; si la carga falla, actual() lanza
+        RuntimeError hasta que el vigilante logre recargar.
+        """
+        self._carga_inicial = threading.Event()
+
+        def cargar():
+            try:
+                (funcion or self.recargar)()
+            except Exception as e:
+                self._error_carga = e
+                print(f"Error al cargar los datos: {e}")
+            finally:
+                self._carga_inicial.set()
+
+        threading.Thread(target=cargar, name="carga-datos", daemon=True).start()
+
+    def iniciar_vigilancia(self, intervalo):
+        """Revisa los archivos cada `intervalo` segundos en un hilo de fondo.
+
+        Los hilos no sobreviven al fork de gunicorn, por eso se lleva la
+        cuenta por pid: llamarla de nuevo en cada worker es seguro.
+        """
+        if not intervalo or self._pid_vigilancia == os.getpid():
+            return
+        self._pid_vigilancia = os.getpid()
+
+        def vigilar():
+            anterior = None
+            while True:
+                time.sleep(intervalo)
+                firmas = firma_archivos(self.fuentes)
+                # Se espera a que la firma se repita en dos revisiones
+                # seguidas, para no leer un Excel que aún se está copiando
+                estable = firmas == anterior
+                anterior = firmas
+                if not estable or firmas == self._firmas:
+                    continue
+                try:
+                    nueva = self.recargar()
+                    print(f"Datos recargados (versión {nueva.version})")
+                except Exception as e:
+                    # Se sigue sirviendo la versión anterior
+                    print(f"Error al recargar los datos: {e}")
+
+        threading.Thread(target=vigilar, name="vigilancia-datos", daemon=True).start()
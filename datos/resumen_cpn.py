@@ -0,0 +1,53 @@
+# datos/resumen_cpn.py
+"""Promedios de los indicadores CPN por municipio, precalculados al cargar."""
+from arranque import perezoso
+
+np = perezoso("numpy")
+pd = perezoso("pandas")
+
+TODOS = "Todos"
+
+
+class ResumenCPN:
+    """Matriz municipio × indicador con el promedio de cada indicador.
+
+    La última fila es "Todos" (promedio sobre todas las filas). fila() es una
+    búsqueda en un dict más una fila de la matriz, sin copiar el DataFrame.
+    """
+
+    def __init__(self, df):
+        self.indicadores = list(df.select_dtypes(include=["number"]).columns)
+        self.etiquetas = [str(col).replace("_", " ").title() for col in self.indicadores]
+
+        valores = df[self.indicadores].to_numpy(dtype=float)
+        presentes = ~np.isnan(valores)
+        valores = np.where(presentes, valores, 0.0)
+
+        self.por_municipio = "Municipio" in df.columns
+        if self.por_municipio:
+            codigos, municipios = pd.factorize(df["Municipio"])
+        else:
+            codigos, municipios = np.full(len(df), -1), []
+        n = len(municipios)
+
+        # Sumas y conteos por municipio (las filas sin municipio solo cuentan en "Todos")
+        sumas = np.zeros((n + 1, len(self.indicadores)))
+        conteos = np.zeros((n + 1, len(self.indicadores)))
+        con_municipio = codigos >= 0
+        np.add.at(sumas, codigos[con_municipio], valores[con_municipio])
+        np.add.at(conteos, codigos[con_municipio], presentes[con_municipio])
+        sumas[n] = valores.sum(axis=0)
+        conteos[n] = presentes.sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.medias = sumas / conteos
+        self.medias.setflags(write=False)
+        self._fila = {m: i for i, m in enumerate(municipios)}
+        if len(df):
+            self._fila[TODOS] = n
+
+    def fila(self, municipio):
+        """Promedios del municipio en el orden de `indicadores` (None si no tiene filas)."""
+        # Sin columna Municipio todos los filtros ven el total
+        i = self._fila.get(municipio if self.por_municipio else TODOS)
+        return None if i is None else self.medias[i]
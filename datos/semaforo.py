@@ -0,0 +1,36 @@
+# datos/semaforo.py
+"""Clasificación vectorizada del semáforo (Valor frente a Meta)."""
+from arranque import perezoso
+
+np = perezoso("numpy")
+pd = perezoso("pandas")
+
+CUMPLE, PARCIAL, NO_CUMPLE = 0, 1, 2
+
+ESTADOS = ("🟢 Cumple", "🟡 Parcial", "🔴 No cumple")
+ICONOS = ("🟢", "🟡", "🔴")
+COLORES = ("success", "warning", "danger")
+
+
+def niveles(valor, meta, fraccion_meta=0.8):
+    """Nivel de cada fila: CUMPLE si valor >= meta; PARCIAL si alcanza
+    fraccion_meta * meta; si no, NO_CUMPLE.
+
+    Los NaN caen en NO_CUMPLE, igual que con las comparaciones fila a fila.
+    """
+    valor = np.asarray(valor, dtype=float)
+    meta = np.broadcast_to(np.asarray(meta, dtype=float), valor.shape)
+    with np.errstate(invalid="ignore"):
+        return np.select([valor >= meta, valor >= meta * fraccion_meta], [CUMPLE, PARCIAL], NO_CUMPLE).astype(np.int8)
+
+
+def niveles_tabla(df, fraccion_meta=0.8):
+    """niveles() sobre las columnas Valor (%) y Meta (%) (meta 90 si no existe)."""
+    valor = df["Valor (%)"] if "Valor (%)" in df.columns else pd.Series(0.0, index=df.index)
+    meta = df["Meta (%)"] if "Meta (%)" in df.columns else 90
+    return niveles(valor, meta, fraccion_meta)
+
+
+def etiquetas(niveles, nombres=ESTADOS):
+    """Texto de cada nivel según `nombres` (ESTADOS, ICONOS o COLORES)."""
+    return np.array(nombres, dtype=object)[niveles]
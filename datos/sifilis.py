@@ -0,0 +1,121 @@
+# datos/sifilis.py
+"""Cubo preagregado de casos de sífilis por semana epidemiológica."""
+import base64
+
+from arranque import perezoso
+
+np = perezoso("numpy")
+pd = perezoso("pandas")
+
+COLUMNAS = ["evento", "municipio", "eps", "semana", "casos"]
+
+# Niveles materializados: (por municipio, por eps). None en la clave = todos.
+_NIVELES = [(True, True), (True, False), (False, True), (False, False)]
+
+
+class CuboSifilis:
+    """Casos por semana para cada combinación (evento, municipio, eps).
+
+    Las marginales "todos los municipios" y "todas las EPS" se guardan con
+    None en su posición de la clave, así cualquier combinación de filtros se
+    responde con una búsqueda en un dict, sin groupby por petición.
+    """
+
+    def __init__(self, df=None):
+        self._celdas = {}
+        self._compacto = None
+        if df is not None:
+            self._sumar(df)
+
+    def serie(self, evento, municipio=None, eps=None):
+        """Serie de casos indexada por semana (vacía si no hay datos)."""
+        serie = self._celdas.get((evento, municipio or None, eps or None))
+        if serie is None:
+            return pd.Series([], index=pd.Index([], name="semana"), name="casos", dtype="float64")
+        return serie
+
+    def compacto(self):
+        """Todas las celdas en arreglos tipados (base64) para filtrar en el navegador.
+
+        Cada entrada es una semana de una celda: `claves` (uint32) empaqueta
+        (evento, municipio, eps, semana) como índice lineal sobre las
+        dimensiones [eventos, municipios + 1, eps + 1, semanas], donde el
+        último índice de municipio/eps es la marginal "todos"; `casos` va en
+        float32. Se calcula una sola vez por cubo.
+        """
+        if self._compacto is not None:
+            return self._compacto
+
+        eventos = sorted({e for e, _, _ in self._celdas})
+        municipios = sorted({m for _, m, _ in self._celdas if m is not None})
+        eps = sorted({p for _, _, p in self._celdas if p is not None})
+        semanas = sorted({s for serie in self._celdas.values() for s in serie.index})
+        pos_evento = {v: i for i, v in enumerate(eventos)}
+        pos_municipio = {v: i for i, v in enumerate(municipios)}
+        pos_eps = {v: i for i, v in enumerate(eps)}
+        dims = [len(eventos), len(municipios) + 1, len(eps) + 1, len(semanas)]
+
+        claves, casos = [], []
+        for (evento, municipio, p), serie in self._celdas.items():
+            celda = np.ravel_multi_index(
+                (pos_evento[evento], pos_municipio.get(municipio, len(municipios)), pos_eps.get(p, len(eps)), 0),
+                dims
+            )
+            claves.append(celda + np.searchsorted(semanas, serie.index.to_numpy()))
+            casos.append(serie.to_numpy())
+
+        def codificar(partes, dtype):
+            arreglo = np.concatenate(partes).astype(dtype) if partes else np.empty(0, dtype)
+            return base64.b64encode(arreglo.tobytes()).decode("ascii")
+
+        self._compacto = {
+            "eventos": eventos,
+            "municipios": municipios,
+            "eps": eps,
+            "semanas": [int(s) for s in semanas],
+            "claves": codificar(claves, "<u4"),
+            "casos": codificar(casos, "<f4"),
+        }
+        return self._compacto
+
+    def ampliado(self, nuevas):
+        """Cubo nuevo con las filas añadidas; solo recalcula las celdas que tocan.
+
+        El cubo original no se modifica: las peticiones que aún lo usan siguen
+        viendo la versión anterior completa.
+        """
+        cubo = CuboSifilis()
+        cubo._celdas = dict(self._celdas)
+        cubo._sumar(nuevas)
+        return cubo
+
+    def _sumar(self, df):
+        if df.empty or not set(COLUMNAS) <= set(df.columns):
+            return
+        base = df[COLUMNAS]
+
+        for por_municipio, por_eps in _NIVELES:
+            grupos = ["evento"] + (["municipio"] if por_municipio else []) + (["eps"] if por_eps else [])
+            suma = base.groupby(grupos + ["semana"], observed=True)["casos"].sum()
+
+            for clave, serie in suma.groupby(level=list(range(len(grupos))), observed=True):
+                clave = clave if isinstance(clave, tuple) else (clave,)
+                evento = clave[0]
+                municipio = clave[1] if por_municipio else None
+                eps = clave[-1] if por_eps else None
+                serie = serie.droplevel(list(range(len(grupos))))
+
+                celda = (evento, municipio, eps)
+                previa = self._celdas.get(celda)
+                if previa is not None:
+                    serie = previa.add(serie, fill_value=0)
+                self._celdas[celda] = serie.sort_index().rename("casos")
+
+
+def es_ampliacion(anterior, nuevo):
+    """True si `nuevo` son las filas de `anterior` más filas añadidas al final."""
+    if anterior is None or len(nuevo) <= len(anterior) or list(anterior.columns) != list(nuevo.columns):
+        return False
+    cabeza = nuevo.iloc[:len(anterior)]
+    return all(cabeza[c].reset_index(drop=True).equals(anterior[c].reset_index(drop=True))
+               for c in COLUMNAS if c in anterior.columns)
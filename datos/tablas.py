@@ -0,0 +1,126 @@
+# datos/tablas.py
+"""Paginación, orden y filtro de los DataTable en el servidor (modo "custom")."""
+import re
+
+from arranque import perezoso
+
+np = perezoso("numpy")
+pd = perezoso("pandas")
+
+# Una condición de filter_query: {columna} operador valor
+_CONDICION = re.compile(
+    r"\{(?P<columna>[^}]+)\}\s*"
+    r"(?P<operador>[is]?(?:contains|datestartswith|ge|le|lt|gt|ne|eq)\b|[is]?(?:>=|<=|!=|<|>|=))\s*"
+    r"(?P<valor>.*)"
+)
+_SIMBOLOS = {">=": "ge", "<=": "le", "<": "lt", ">": "gt", "!=": "ne", "=": "eq"}
+
+
+def condiciones(filter_query):
+    """[(columna, operador, valor, sensible_mayusculas)] a partir de filter_query."""
+    resultado = []
+    for parte in (filter_query or "").split(" && "):
+        coincidencia = _CONDICION.match(parte.strip())
+        if not coincidencia:
+            continue
+        operador = coincidencia["operador"]
+        sensible = not operador.startswith("i")
+        # Prefijo i/s (insensible/sensible a mayúsculas) o símbolo -> nombre base
+        operador = operador.lstrip("is")
+        operador = _SIMBOLOS.get(operador, operador)
+
+        valor = coincidencia["valor"].strip()
+        if valor[:1] in ("'", '"', "`") and valor[-1:] == valor[:1] and len(valor) > 1:
+            valor = valor[1:-1].replace("\\" + valor[0], valor[0])
+        elif operador not in ("contains", "datestartswith"):
+            try:
+                valor = float(valor)
+            except ValueError:
+                pass
+        resultado.append((coincidencia["columna"], operador, valor, sensible))
+    return resultado
+
+
+def _orden(serie):
+    try:
+        ordenada = serie.sort_values(kind="stable", na_position="last")
+    except TypeError:
+        # Columnas con tipos mezclados: se ordenan como texto
+        ordenada = serie.astype(str).sort_values(kind="stable")
+    return ordenada.index.to_numpy()
+
+
+class TablaPaginada:
+    """Filas de una tabla con el orden de cada columna precalculado.
+
+    pagina() filtra con máscaras vectorizadas, toma el orden ya calculado de
+    la columna pedida y solo convierte a registros las filas de la página.
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        # Orden ascendente estable por columna, con los vacíos al final
+        self._orden = {col: _orden(self.df[col]) for col in self.df.columns}
+
+    def __len__(self):
+        return len(self.df)
+
+    def _mascara(self, filter_query):
+        mascara = np.ones(len(self.df), dtype=bool)
+        for columna, operador, valor, sensible in condiciones(filter_query):
+            if columna not in self.df.columns:
+                continue
+            serie = self.df[columna]
+            if operador in ("contains", "datestartswith"):
+                texto = serie.astype("string")
+                if operador == "contains":
+                    cumple = texto.str.contains(str(valor), case=sensible, regex=False)
+                else:
+                    cumple = texto.str.startswith(str(valor))
+            elif isinstance(valor, float) and pd.api.types.is_numeric_dtype(serie):
+                cumple = getattr(serie, operador)(valor)
+            elif operador in ("eq", "ne"):
+                texto = serie.astype("string")
+                if not sensible:
+                    texto, valor = texto.str.lower(), str(valor).lower()
+                cumple = getattr(texto, operador)(str(valor))
+            else:
+                cumple = getattr(serie.astype("string"), operador)(str(valor))
+            mascara &= np.asarray(cumple.fillna(False), dtype=bool)
+        return mascara
+
+    def posiciones(self, sort_by=None, filter_query=""):
+        """Posiciones de las filas que pasan el filtro, en el orden pedido
+        (None = todas, en el orden original)."""
+        orden = None
+        if sort_by and sort_by[0]["column_id"] in self._orden:
+            orden = self._orden[sort_by[0]["column_id"]]
+            if sort_by[0]["direction"] == "desc":
+                orden = orden[::-1]
+
+        if filter_query:
+            mascara = self._mascara(filter_query)
+            orden = np.flatnonzero(mascara) if orden is None else orden[mascara[orden]]
+        return orden
+
+    def filas(self, sort_by=None, filter_query=""):
+        """DataFrame con el filtro y el orden de la tabla (p. ej. para exportar)."""
+        orden = self.posiciones(sort_by, filter_query)
+        return self.df if orden is None else self.df.iloc[orden]
+
+    def pagina(self, pagina=0, tamano=15, sort_by=None, filter_query=""):
+        """(registros de la página, número de páginas, página mostrada).
+
+        Si el filtro deja menos páginas que `pagina`, se muestra la última.
+        """
+        orden = self.posiciones(sort_by, filter_query)
+        total = len(self.df) if orden is None else len(orden)
+
+        paginas = max(1, -(-total // tamano))
+        pagina = min(pagina or 0, paginas - 1)
+        inicio = pagina * tamano
+        if orden is None:
+            filas = self.df.iloc[inicio:inicio + tamano]
+        else:
+            filas = self.df.iloc[orden[inicio:inicio + tamano]]
+        return filas.to_dict("records"), paginas, pagina
@@ -0,0 +1,84 @@
+# exportacion.py
+"""Descarga en CSV o XLSX de la vista filtrada, enviada por partes.
+
+registrar(server, obtener_filas) agrega la ruta /exportar/<vista>.<formato>;
+obtener_filas(vista, parametros) devuelve el DataFrame ya filtrado y
+ordenado (o None si la vista no existe). Las filas se escriben de a bloques:
+el CSV se genera mientras se envía y el XLSX se arma con openpyxl en modo
+write-only sobre un archivo temporal, que luego se envía por partes.
+"""
+import re
+import tempfile
+import time
+import unicodedata
+
+from flask import Response, abort, request, stream_with_context
+
+FILAS_POR_BLOQUE = 5000
+BYTES_POR_BLOQUE = 64 * 1024
+
+TIPOS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _bloques(df):
+    for inicio in range(0, len(df), FILAS_POR_BLOQUE):
+        yield df.iloc[inicio:inicio + FILAS_POR_BLOQUE]
+
+
+def csv_por_partes(df):
+    # BOM para que Excel abra bien las tildes
+    yield "\ufeff" + df.iloc[:0].to_csv(index=False)
+    for bloque in _bloques(df):
+        yield bloque.to_csv(header=False, index=False)
+
+
+def xlsx_por_partes(df, hoja="Datos"):
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    pagina = libro.create_sheet(hoja[:31])
+    pagina.append(list(map(str, df.columns)))
+    for bloque in _bloques(df):
+        # NaN -> celda vacía (Excel no acepta NaN)
+        bloque = bloque.astype(object).where(bloque.notna(), None)
+        for fila in bloque.itertuples(index=False, name=None):
+            pagina.append(fila)
+
+    with tempfile.TemporaryFile() as archivo:
+        libro.save(archivo)
+        archivo.seek(0)
+        while True:
+            parte = archivo.read(BYTES_POR_BLOQUE)
+            if not parte:
+                break
+            yield parte
+
+
+def nombre_archivo(vista, parametros, formato):
+    partes = [vista] + [v for k, v in sorted(parametros.items()) if k not in ("filtro", "orden", "dir") and v]
+    # Solo ASCII: el nombre va en una cabecera HTTP
+    base = unicodedata.normalize("NFKD", "_".join(partes)).encode("ascii", "ignore").decode()
+    base = re.sub(r"[^\w.-]+", "_", base).strip("_")
+    return f"{base}_{time.strftime('%Y%m%d')}.{formato}"
+
+
+def registrar(server, obtener_filas, ruta="/exportar"):
+    def exportar(vista, formato):
+        if formato not in TIPOS:
+            abort(404)
+        parametros = request.args.to_dict()
+        df = obtener_filas(vista, parametros)
+        if df is None:
+            abort(404)
+
+        partes = csv_por_partes(df) if formato == "csv" else xlsx_por_partes(df, vista)
+        return Response(
+            stream_with_context(partes),
+            mimetype=TIPOS[formato],
+            headers={"Content-Disposition": f'attachment; filename="{nombre_archivo(vista, parametros, formato)}"'},
+        )
+
+    server.add_url_rule(f"{ruta}/<vista>.<formato>", "exportar", exportar)
@@ -0,0 +1,169 @@
+# graficos.py
+"""Construcción de las figuras de los callbacks.
+
+Funciones puras: reciben el DataFrame ya filtrado y devuelven la figura. Al
+vivir en su propio módulo (sin depender de app.py) se pueden ejecutar en el
+pool de procesos de pool_figuras.
+"""
+from arranque import perezoso
+from datos.geometria import codigo_municipio, geometria_cauca
+
+px = perezoso("plotly.express")
+go = perezoso("plotly.graph_objects")
+
+
+def figura_barras_cpn(df_grafico, municipio):
+    fig = px.bar(
+        df_grafico,
+        x="Indicador",
+        y="Valor",
+        title=f"Indicadores CPN - {municipio}",
+        color="Valor",
+        color_continuous_scale="RdYlGn",
+        range_color=[0, 100]
+    )
+    fig.update_layout(
+        height=400,
+        xaxis_tickangle=-45,
+        title_x=0.5
+    )
+    return fig
+
+def figura_mapa_calor_cpn(df_cpn, indicador):
+    """Barras horizontales que simulan un mapa de calor del indicador CPN"""
+    fig = px.bar(
+        df_cpn,
+        x=indicador,
+        y='Municipio',
+        orientation='h',
+        color=indicador,
+        color_continuous_scale='RdYlGn',
+        text=indicador
+    )
+    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside',
+                      hovertemplate="%{y}: %{x:.1f}%<extra></extra>")
+    fig.update_layout(
+        height=max(400, len(df_cpn) * 30),
+        title_x=0.5,
+        yaxis_title="Municipios",
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    return parchar_mapa_calor_cpn(fig, df_cpn, indicador)
+
+def parchar_mapa_calor_cpn(fig, df_cpn, indicador):
+    """Escribe en `fig` (Figure o Patch) solo lo que depende del indicador"""
+    valores = df_cpn[indicador].tolist()
+    nombre = indicador.replace('_', ' ').title()
+    fig["data"][0]["x"] = valores
+    fig["data"][0]["text"] = valores
+    fig["data"][0]["marker"]["color"] = valores
+    fig["layout"]["title"]["text"] = f"Mapa de Calor - {nombre} por Municipio"
+    fig["layout"]["xaxis"]["title"]["text"] = f"{nombre} (%)"
+    fig["layout"]["coloraxis"]["colorbar"]["title"]["text"] = nombre
+    return fig
+
+def figura_mapa_gestantes(df_cpn2, indicador):
+    """Mapa coroplético del indicador de gestantes (geometría simplificada del Cauca)"""
+    # Solo los municipios que tienen polígono en la geometría del Cauca
+    codigos = df_cpn2["Municipio"].map(codigo_municipio)
+    df_mapa = df_cpn2[codigos.notna()]
+    fig = go.Figure(go.Choropleth(
+        geojson=geometria_cauca(),
+        featureidkey="id",
+        locations=codigos[codigos.notna()],
+        text=df_mapa["Municipio"],
+        colorscale="Reds",
+        marker_line_color="white",
+        marker_line_width=0.5,
+        hovertemplate="<b>%{text}</b><br>%{z:,.0f}<extra></extra>"
+    ))
+    # Sin mapa base: solo los polígonos municipales
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(
+        title_x=0.5,
+        height=550,
+        margin={"r": 0, "t": 50, "l": 0, "b": 0}
+    )
+    return parchar_mapa_gestantes(fig, df_mapa, indicador)
+
+def parchar_mapa_gestantes(fig, df_cpn2, indicador):
+    """Escribe en `fig` (Figure o Patch) solo los valores y títulos del indicador"""
+    df_mapa = df_cpn2[df_cpn2["Municipio"].map(codigo_municipio).notna()]
+    nombre = indicador.replace('_', ' ').title()
+    fig["data"][0]["z"] = df_mapa[indicador].tolist()
+    fig["data"][0]["colorbar"]["title"]["text"] = nombre
+    fig["layout"]["title"]["text"] = f"Mapa de Calor - {nombre} por Municipio"
+    return fig
+
+def figura_categoria(df_filtrado, titulo, tipo):
+    if tipo == "Barras":
+        fig = px.bar(df_filtrado, x="Indicador", y="Valor (%)",
+                     title=titulo, color="Valor (%)",
+                     color_continuous_scale="RdYlGn")
+    elif tipo == "Línea":
+        fig = px.line(df_filtrado, x="Indicador", y="Valor (%)",
+                      title=titulo, markers=True)
+    elif tipo == "Pastel":
+        fig = px.pie(df_filtrado, names="Indicador", values="Valor (%)",
+                     title=titulo)
+    else:
+        fig = px.bar(df_filtrado, x="Indicador", y="Valor (%)", title=titulo)
+
+    fig.update_layout(height=400, title_x=0.5)
+    return fig
+
+def figura_violencia(df_vs, municipio):
+    fig = px.bar(
+        df_vs,
+        x="Indicador",
+        y="Valor (%)",
+        title=f"Violencia Sexual - {municipio}",
+        color="Indicador",
+        text="Valor (%)"
+    )
+    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    fig.update_layout(height=400, title_x=0.5, showlegend=False)
+    return fig
+
+def figura_tendencia_violencia(df_vs, municipio):
+    """Valor de cada indicador de violencia sexual por año."""
+    fig = px.line(
+        df_vs.sort_values("Año"),
+        x="Año",
+        y="Valor (%)",
+        color="Indicador",
+        title=f"Tendencia Violencia Sexual - {municipio}",
+        markers=True
+    )
+    fig.update_layout(height=400, title_x=0.5, xaxis_title="Año", xaxis_dtick=1)
+    return fig
+
+def figura_mapa_violencia(df_vs):
+    """Mapa coroplético del valor promedio de violencia sexual por municipio"""
+    codigos = df_vs["Municipio"].map(codigo_municipio)
+    df_mapa = df_vs[codigos.notna()]
+    fig = go.Figure(go.Choropleth(
+        geojson=geometria_cauca(),
+        featureidkey="id",
+        locations=codigos[codigos.notna()],
+        z=df_mapa["Valor (%)"],
+        text=df_mapa["Municipio"],
+        colorscale="Reds",
+        marker_line_color="white",
+        marker_line_width=0.5,
+        hovertemplate="<b>%{text}</b><br>Valor: %{z:.1f}%<extra></extra>"
+    ))
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0})
+    return fig
+
+def figura_sifilis(df_grouped, evento):
+    fig = px.bar(
+        df_grouped,
+        x="semana", y="casos",
+        title=f"Casos de {evento} por semana epidemiológica",
+        labels={"semana": "Semana", "casos": "Número de casos"},
+        color_discrete_sequence=["#6c757d"]
+    )
+    fig.update_layout(margin=dict(t=40, l=20, r=20, b=20))
+    return fig
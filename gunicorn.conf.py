@@ -0,0 +1,62 @@
+# gunicorn.conf.py
+"""Configuración de gunicorn para el tablero.
+
+Los datos se cargan una sola vez en el proceso maestro (preload_app) y los
+workers los heredan por fork: las páginas se comparten mientras nadie las
+escriba. Las columnas numéricas además vienen mapeadas desde data/.cache,
+así que también se comparten entre reinicios de workers.
+
+Con TABLERO_PRELOAD=0 cada worker importa la app por su cuenta: atiende
+apenas termina de importarla y carga los datos en un hilo (config.CARGA_DIFERIDA).
+"""
+import gc
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8050')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+preload_app = os.environ.get("TABLERO_PRELOAD", "1") == "1"
+if preload_app:
+    # El maestro carga antes del fork: un hilo de carga no llegaría a los workers
+    os.environ["TABLERO_CARGA_DIFERIDA"] = "0"
+timeout = int(os.environ.get("TABLERO_TIMEOUT_WORKER", "30"))
+
+# dash importa IPython, si está instalado, para su modo Jupyter; en el
+# servidor no se usa y sumaría cientos de ms al import de cada worker
+sys.modules.setdefault("IPython", None)
+
+# Perfil de concurrencia (TABLERO_WORKER):
+#   sync    - un request a la vez por worker (por defecto)
+#   gthread - TABLERO_HILOS hilos por worker; conviene junto con
+#             TABLERO_FIGURAS_PROCESOS > 0 para que plotly no retenga el GIL
+#   gevent  - corrutinas (requiere instalar gevent); TABLERO_CONEXIONES por worker
+worker_class = os.environ.get("TABLERO_WORKER", "sync")
+if worker_class == "gthread":
+    threads = int(os.environ.get("TABLERO_HILOS", "4"))
+elif worker_class == "gevent":
+    worker_connections = int(os.environ.get("TABLERO_CONEXIONES", "100"))
+
+
+def when_ready(server):
+    # Congela los objetos creados durante la carga para que el recolector de
+    # basura no los toque en los workers (cada toque copiaría la página).
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # El vigilante de archivos corre en cada worker: los hilos no sobreviven al fork
+    import app
+    import config
+    app.registro.iniciar_vigilancia(config.INTERVALO_VIGILANCIA)
+    # Cada worker deja sus vistas por defecto en caché antes del primer usuario
+    # (con carga diferida arranca solo, al publicarse los datos)
+    if config.PRECALENTAR and app.registro.lista():
+        app.precalentador.iniciar()
+
+
+def worker_exit(server, worker):
+    # Los procesos del pool de figuras se cierran con su worker
+    import app
+    app.pool_figuras.cerrar()
+    # Las combinaciones pedidas quedan para el precalentamiento del próximo arranque
+    app.metricas.guardar_combinaciones(app.RUTA_COMBINACIONES)
@@ -0,0 +1,228 @@
+# instrumentacion.py
+"""Tiempos y tamaño de respuesta por callback, expuestos en /metrics.
+
+instrumentar(app) envuelve cada @app.callback que se registre después y mide
+tiempo de pared, tiempo de CPU del hilo y, dentro del callback, las fases
+marcadas con `with metricas.fase("filtro"):` / `fase("figura")`. El tamaño de
+la respuesta se toma en el after_request de Flask. Con server_timing=True
+cada respuesta de callback lleva además la cabecera Server-Timing.
+
+Las métricas son por proceso: con varios workers de gunicorn cada uno
+expone las suyas. Además se cuentan las combinaciones de entradas de cada
+callback; guardar_combinaciones() las acumula en un JSON compartido para que
+el precalentamiento sepa qué vistas se piden más, aun después de un deploy.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from dash.exceptions import PreventUpdate
+from flask import Response, request
+
+from datos.cache_columnar import escribir_json
+
+FASES = ("pared", "cpu", "filtro", "figura")
+
+# Límites (segundos) del histograma de duración
+LIMITES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _etiqueta(valor):
+    """Valor de etiqueta escapado según el formato de exposición (barra invertida, comillas, salto de línea)."""
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._llamadas = defaultdict(int)
+        self._errores = defaultdict(int)
+        self._omitidos = defaultdict(int)  # PreventUpdate: sin cambios o pool sin cupo, no es error
+        self._segundos = defaultdict(float)  # (callback, fase) -> suma
+        self._bytes = defaultdict(int)
+        self._histograma = defaultdict(lambda: [0] * (len(LIMITES) + 1))
+        self._externas = []
+        self._combinaciones = Counter()  # (callback, args en JSON) -> llamadas
+        self._combinaciones_guardadas = Counter()
+
+    # --- medición -------------------------------------------------------
+
+    @contextmanager
+    def fase(self, nombre):
+        """Suma el tiempo del bloque a la fase `nombre` del callback en curso."""
+        medicion = getattr(self._local, "actual", None)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            if medicion is not None:
+                medicion[nombre] = medicion.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    def envolver(self, nombre, funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            medicion = {"callback": nombre}
+            self._local.actual = medicion
+            inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+            try:
+                resultado = funcion(*args, **kwargs)
+                self._contar_combinacion(nombre, args)
+                return resultado
+            except PreventUpdate:
+                with self._lock:
+                    self._omitidos[nombre] += 1
+                raise
+            except Exception:
+                with self._lock:
+                    self._errores[nombre] += 1
+                raise
+            finally:
+                medicion["pared"] = time.perf_counter() - inicio
+                medicion["cpu"] = time.thread_time() - inicio_cpu
+                self._local.actual = None
+                self._local.ultima = medicion
+                self._registrar(medicion)
+        return envoltura
+
+    def _registrar(self, medicion):
+        nombre = medicion["callback"]
+        with self._lock:
+            self._llamadas[nombre] += 1
+            for fase in FASES:
+                self._segundos[(nombre, fase)] += medicion.get(fase, 0.0)
+            cubeta = next((i for i, limite in enumerate(LIMITES) if medicion["pared"] <= limite), len(LIMITES))
+            self._histograma[nombre][cubeta] += 1
+
+    def _contar_combinacion(self, nombre, args):
+        try:
+            clave = (nombre, json.dumps(args, ensure_ascii=False))
+        except TypeError:
+            return
+        with self._lock:
+            self._combinaciones[clave] += 1
+
+    # --- combinaciones más pedidas ----------------------------------------
+
+    def combinaciones_frecuentes(self, n, ruta=None, callbacks=None):
+        """[(callback, [args])] más pedidos: los de este proceso más los guardados en `ruta`."""
+        with self._lock:
+            total = Counter(self._combinaciones)
+        total.update(_leer_combinaciones(ruta))
+        elegidas = [(c, a) for (c, a), _ in total.most_common() if callbacks is None or c in callbacks]
+        return [(c, json.loads(a)) for c, a in elegidas[:n]]
+
+    def guardar_combinaciones(self, ruta):
+        """Suma al JSON de `ruta` lo contado desde el último guardado."""
+        with self._lock:
+            nuevas = self._combinaciones - self._combinaciones_guardadas
+            self._combinaciones_guardadas = Counter(self._combinaciones)
+        if not nuevas:
+            return
+        total = _leer_combinaciones(ruta)
+        total.update(nuevas)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        escribir_json(ruta, [[c, a, n] for (c, a), n in total.most_common(1000)])
+
+    def agregar_externa(self, nombre, ayuda, tipo, funcion):
+        """Métrica calculada al exportar: funcion() -> {etiquetas: valor}."""
+        self._externas.append((nombre, ayuda, tipo, funcion))
+
+    # --- integración con Dash/Flask ---------------------------------------
+
+    def instrumentar(self, app, server_timing=False, ruta="/metrics"):
+        original = app.callback
+
+        def callback(*args, **kwargs):
+            decorador = original(*args, **kwargs)
+
+            def registrar(funcion):
+                decorador(self.envolver(funcion.__name__, funcion))
+                # Se devuelve la función sin envolver para poder llamarla directamente
+                return funcion
+            return registrar
+
+        app.callback = callback
+        server = app.server
+
+        @server.after_request
+        def medir_respuesta(respuesta):
+            medicion = getattr(self._local, "ultima", None)
+            if medicion is None or not request.path.endswith("_dash-update-component"):
+                return respuesta
+            self._local.ultima = None
+            with self._lock:
+                self._bytes[medicion["callback"]] += respuesta.calculate_content_length() or 0
+            if server_timing:
+                respuesta.headers["Server-Timing"] = ", ".join(
+                    [f'cb;desc="{medicion["callback"]}";dur={medicion["pared"] * 1000:.2f}']
+                    + [f"{fase};dur={medicion[fase] * 1000:.2f}" for fase in FASES[1:] if fase in medicion]
+                )
+            return respuesta
+
+        server.add_url_rule(ruta, "metricas", lambda: Response(self.exportar(), mimetype="text/plain; version=0.0.4"))
+
+    # --- exportación ----------------------------------------------------
+
+    def exportar(self):
+        """Texto en formato de exposición de Prometheus."""
+        lineas = []
+
+        def metrica(nombre, ayuda, tipo, valores):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            for etiquetas, valor in valores:
+                texto = ",".join(f'{k}="{_etiqueta(v)}"' for k, v in etiquetas)
+                lineas.append(f"{nombre}{{{texto}}} {valor}" if texto else f"{nombre} {valor}")
+
+        with self._lock:
+            callbacks = sorted(self._llamadas)
+            metrica("tablero_callback_llamadas_total", "Llamadas por callback.", "counter",
+                    [((("callback", c),), self._llamadas[c]) for c in callbacks])
+            metrica("tablero_callback_errores_total", "Callbacks que terminaron con excepción.", "counter",
+                    [((("callback", c),), self._errores[c]) for c in callbacks])
+            metrica("tablero_callback_omitidos_total",
+                    "Llamadas que terminaron en PreventUpdate (nada que actualizar o pool de figuras sin cupo).",
+                    "counter",
+                    [((("callback", c),), self._omitidos[c]) for c in callbacks])
+            metrica("tablero_callback_segundos_total",
+                    "Tiempo acumulado por fase (pared, cpu, filtro de pandas, construcción de la figura).",
+                    "counter",
+                    [((("callback", c), ("fase", f)), round(self._segundos[(c, f)], 6))
+                     for c in callbacks for f in FASES])
+            metrica("tablero_callback_respuesta_bytes_total", "Bytes enviados en las respuestas.", "counter",
+                    [((("callback", c),), self._bytes[c]) for c in callbacks])
+
+            lineas.append("# HELP tablero_callback_duracion_segundos Duración de cada llamada.")
+            lineas.append("# TYPE tablero_callback_duracion_segundos histogram")
+            for callback in callbacks:
+                c = _etiqueta(callback)
+                acumulado = 0
+                for limite, cuenta in zip(list(LIMITES) + ["+Inf"], self._histograma[callback]):
+                    acumulado += cuenta
+                    lineas.append(f'tablero_callback_duracion_segundos_bucket{{callback="{c}",le="{limite}"}} {acumulado}')
+                lineas.append(f'tablero_callback_duracion_segundos_sum{{callback="{c}"}} '
+                              f'{round(self._segundos[(callback, "pared")], 6)}')
+                lineas.append(f'tablero_callback_duracion_segundos_count{{callback="{c}"}} {self._llamadas[callback]}')
+
+        for nombre, ayuda, tipo, funcion in self._externas:
+            metrica(nombre, ayuda, tipo, funcion())
+        return "\n".join(lineas) + "\n"
+
+
+def _leer_combinaciones(ruta):
+    if not ruta or not os.path.exists(ruta):
+        return Counter()
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return Counter({(c, a): n for c, a, n in json.load(f)})
+    except (OSError, ValueError) as e:
+        print(f"No se pudieron leer las combinaciones guardadas: {e}")
+        return Counter()
+
+
+metricas = Metricas()
@@ -0,0 +1,107 @@
+# pool_figuras.py
+"""Pool acotado de procesos para construir las figuras fuera del worker web.
+
+Con TABLERO_FIGURAS_PROCESOS=0 (por defecto) ejecutar() llama la función en
+el mismo proceso. Con N > 0 la figura se arma en un proceso aparte y el hilo
+del worker solo espera, así con workers gthread/gevent las demás peticiones
+siguen atendiéndose mientras plotly trabaja.
+
+Límites:
+* cupos: como mucho `pendientes` figuras en cola o en curso por worker; si no
+  hay cupo en `espera` segundos se rechaza la petición (contrapresión).
+* timeout: si la figura no está en `timeout` segundos se deja de esperar.
+
+En ambos casos se lanza PoolOcupado, que es un PreventUpdate: Dash deja la
+salida como estaba y nada se guarda en la caché de figuras.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturoVencido
+from concurrent.futures.process import BrokenProcessPool
+
+from dash.exceptions import PreventUpdate
+
+
+class PoolOcupado(PreventUpdate):
+    """Sin cupo en el pool o la figura no llegó a tiempo."""
+
+
+def _construir(funcion, args):
+    # Se devuelve el dict de la figura: viaja por pickle más rápido que el Figure
+    return funcion(*args).to_plotly_json()
+
+
+def _contexto():
+    # forkserver evita hacer fork de un worker con hilos; los hijos precargan
+    # el módulo de gráficos una sola vez
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context("forkserver")
+        contexto.set_forkserver_preload(["graficos"])
+        return contexto
+    return multiprocessing.get_context("spawn")
+
+
+class PoolFiguras:
+    def __init__(self, procesos=0, pendientes=None, timeout=10.0, espera=0.5):
+        self.procesos = procesos
+        self.timeout = timeout
+        self.espera = espera
+        self._cupos = threading.BoundedSemaphore(pendientes or 2 * procesos) if procesos else None
+        self._lock = threading.Lock()
+        self._ejecutor = None
+        self._pid = None
+        self.rechazos = {"ocupado": 0, "timeout": 0}
+
+    def _obtener_ejecutor(self):
+        # Un pool por proceso: se crea en el primer uso, ya dentro del worker
+        with self._lock:
+            if self._ejecutor is None or self._pid != os.getpid():
+                self._ejecutor = ProcessPoolExecutor(self.procesos, mp_context=_contexto())
+                self._pid = os.getpid()
+            return self._ejecutor
+
+    def _descartar_ejecutor(self, ejecutor):
+        with self._lock:
+            if self._ejecutor is ejecutor:
+                self._ejecutor = None
+        ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    def ejecutar(self, funcion, *args):
+        """funcion(*args) en el pool; devuelve la figura (Figure en línea, dict desde el pool)."""
+        if not self.procesos:
+            return funcion(*args)
+
+        if not self._cupos.acquire(timeout=self.espera):
+            self.rechazos["ocupado"] += 1
+            raise PoolOcupado()
+
+        ejecutor = self._obtener_ejecutor()
+        try:
+            futuro = ejecutor.submit(_construir, funcion, args)
+        except BaseException as e:
+            self._cupos.release()
+            if isinstance(e, BrokenProcessPool):
+                self._descartar_ejecutor(ejecutor)
+            raise
+        # El cupo se libera cuando el proceso termina, aunque ya no se espere
+        futuro.add_done_callback(lambda _: self._cupos.release())
+
+        try:
+            return futuro.result(timeout=self.timeout)
+        except FuturoVencido:
+            futuro.cancel()
+            self.rechazos["timeout"] += 1
+            print(f"Figura {funcion.__name__} sin terminar en {self.timeout}s")
+            raise PoolOcupado()
+        except BrokenProcessPool:
+            # Un proceso hijo murió: se arma un pool nuevo en la próxima petición
+            self._descartar_ejecutor(ejecutor)
+            raise
+
+    def cerrar(self):
+        with self._lock:
+            ejecutor, self._ejecutor = self._ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,81 @@
+# precalentamiento.py
+"""Precalcula en segundo plano las salidas de los callbacks más probables.
+
+Después de cargar (o recargar) los datos, un hilo llama a los callbacks
+memoizados con las entradas por defecto del layout y con las combinaciones
+más pedidas según instrumentacion. Así las salidas quedan en la caché de
+figuras antes de que llegue el primer usuario. Si se publica otra versión de
+datos mientras corre, se detiene: la nueva versión tendrá su propio
+precalentamiento.
+"""
+import os
+import threading
+import time
+
+
+class Precalentador:
+    def __init__(self, callbacks, vistas_por_defecto, frecuentes, version, guardar=None, intervalo_guardado=300):
+        """
+        callbacks: nombre -> función memoizada.
+        vistas_por_defecto(): [(nombre, args)] de la página recién abierta.
+        frecuentes(): [(nombre, args)] más pedidos.
+        version(): versión de datos vigente.
+        guardar(): persiste las combinaciones contadas (cada `intervalo_guardado` s).
+        """
+        self.callbacks = callbacks
+        self.vistas_por_defecto = vistas_por_defecto
+        self.frecuentes = frecuentes
+        self.version = version
+        self.guardar = guardar
+        self.intervalo_guardado = intervalo_guardado
+        self._lock = threading.Lock()
+        self._hechas = set()  # (pid, versión) ya precalentadas
+        self._guardado_pid = None
+        self.ultimo = {}
+
+    def iniciar(self):
+        """Lanza el hilo para la versión vigente (una vez por proceso y versión)."""
+        clave = (os.getpid(), self.version())
+        with self._lock:
+            if clave in self._hechas:
+                return
+            self._hechas.add(clave)
+            iniciar_guardado = self.guardar is not None and self._guardado_pid != os.getpid()
+            if iniciar_guardado:
+                self._guardado_pid = os.getpid()
+        threading.Thread(target=self.correr, args=(clave[1],), name="precalentamiento", daemon=True).start()
+        if iniciar_guardado:
+            threading.Thread(target=self._guardar_periodicamente, name="combinaciones", daemon=True).start()
+
+    def correr(self, version):
+        inicio = time.perf_counter()
+        tareas, vistas = [], set()
+        for nombre, args in list(self.vistas_por_defecto()) + list(self.frecuentes()):
+            clave = (nombre, repr(args))
+            if nombre in self.callbacks and clave not in vistas:
+                vistas.add(clave)
+                tareas.append((nombre, args))
+
+        hechas = errores = 0
+        for nombre, args in tareas:
+            if self.version() != version:
+                break
+            try:
+                self.callbacks[nombre](*args)
+                hechas += 1
+            except Exception as e:
+                # PreventUpdate, pool ocupado, datos incompletos...: se sigue con la próxima
+                errores += 1
+                print(f"Precalentamiento {nombre}{tuple(args)}: {type(e).__name__}: {e}")
+
+        self.ultimo = {"version": version, "vistas": hechas, "errores": errores,
+                       "segundos": round(time.perf_counter() - inicio, 2)}
+        print(f"Precalentamiento de la versión {version}: {hechas} vistas en {self.ultimo['segundos']}s")
+
+    def _guardar_periodicamente(self):
+        while True:
+            time.sleep(self.intervalo_guardado)
+            try:
+                self.guardar()
+            except OSError as e:
+                print(f"No se pudieron guardar las combinaciones: {e}")
@@ -0,0 +1,26 @@
+# tests/test_esquema.py
+import pandas as pd
+
+from datos import esquema
+
+
+def test_gestantes_suma_municipios_que_se_unen_al_normalizar():
+    df = pd.DataFrame({"Municipio": ["PATI A", "POPAYÁN", "PATIA"], "Gestantes Activas": [145, 60, 3]})
+    validas, descartadas = esquema.validar("gestantes", df)
+    assert descartadas.empty
+    totales = dict(zip(validas["Municipio"], validas["Gestantes Activas"]))
+    assert totales == {"POPAYÁN": 60, "PATIA": 148}
+
+
+def test_indicadores_repetidos_van_a_cuarentena():
+    fila = {"Año": 2024, "Indicador": "Sífilis", "Numerador": 1, "Denominador": 2,
+            "Valor (%)": 50, "Meta (%)": 80, "Categoría": "ITS"}
+    df = pd.DataFrame([
+        {**fila, "Municipio": "Patía"},
+        {**fila, "Municipio": "PATI A", "Valor (%)": 70},
+        {**fila, "Municipio": "Popayán"},
+    ])
+    validas, descartadas = esquema.validar("indicadores", df)
+    assert list(validas["Municipio"]) == ["Popayán"]
+    assert list(descartadas["Municipio"]) == ["Patía", "PATI A"]
+    assert set(descartadas["motivo"]) == {"Año, Municipio, Categoría, Indicador: repetido"}